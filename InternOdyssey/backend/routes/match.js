@@ -2,6 +2,8 @@ const express = require("express");
 const multer = require("multer");
 const fs = require("fs");
 const path = require("path");
+const crypto = require("crypto");
+const zlib = require("zlib");
 const axios = require("axios");
 const FormData = require("form-data");
 
@@ -13,16 +15,19 @@ if (!fs.existsSync(uploadsDir)) {
   fs.mkdirSync(uploadsDir, { recursive: true });
 }
 
-// Multer storage config for JSON files
-const storage = multer.diskStorage({
-  destination: function (_req, _file, cb) {
-    cb(null, uploadsDir);
-  },
-  filename: function (_req, file, cb) {
-    const safeName = file.originalname.replace(/[^a-zA-Z0-9._-]/g, "_");
-    cb(null, `${Date.now()}-${safeName}`);
-  },
-});
+// Files are kept in memory by multer and stored by saveUpload below
+const storage = multer.memoryStorage();
+
+// Uploads are stored under the SHA-256 of their content, so re-uploading the same
+// file reuses the stored copy instead of adding another timestamped duplicate
+const saveUpload = (buffer) => {
+  const hash = crypto.createHash("sha256").update(buffer).digest("hex").slice(0, 32);
+  const filePath = path.join(uploadsDir, `${hash}.json`);
+  if (!fs.existsSync(filePath)) {
+    fs.writeFileSync(filePath, buffer);
+  }
+  return filePath;
+};
 
 const jsonFileFilter = (_req, file, cb) => {
   const isJson =
@@ -39,6 +44,22 @@ const getFastApiBaseUrl = () => {
   return process.env.FASTAPI_URL || process.env.NGROK_URL;
 };
 
+// Candidate JSON compresses ~10x, but only pybackend.py accepts gzip bodies
+// (bc.py and updated_bc.py read them as plain UTF-8), so compression is opt-in
+const gzipForward = () => ["1", "true"].includes((process.env.FASTAPI_GZIP || "").toLowerCase());
+
+// pybackend.py detects gzip uploads by their magic bytes
+const appendFile = (form, buffer, filename) => {
+  if (!gzipForward()) {
+    form.append("file", buffer, { filename, contentType: "application/json" });
+    return;
+  }
+  form.append("file", zlib.gzipSync(buffer), {
+    filename: `${filename}.gz`,
+    contentType: "application/gzip",
+  });
+};
+
 // 1) Upload Resume JSON
 // Endpoint: POST /api/upload_resumes
 router.post("/upload_resumes", upload.single("file"), async (req, res) => {
@@ -47,8 +68,8 @@ router.post("/upload_resumes", upload.single("file"), async (req, res) => {
       return res.status(400).json({ message: "No file uploaded. Use field name 'file'." });
     }
 
-    const filePath = req.file.path;
-    const raw = fs.readFileSync(filePath, "utf8");
+    const filePath = saveUpload(req.file.buffer);
+    const raw = req.file.buffer.toString("utf8");
     let parsed = null;
     try {
       parsed = JSON.parse(raw);
@@ -56,10 +77,33 @@ router.post("/upload_resumes", upload.single("file"), async (req, res) => {
       return res.status(400).json({ message: "Uploaded file is not valid JSON" });
     }
 
+    // Hand the file to FastAPI so candidate text/embeddings are precomputed now,
+    // not on the first match request. Upload still succeeds if FastAPI is down.
+    let ingest = { status: "skipped" };
+    const baseUrl = getFastApiBaseUrl();
+    if (baseUrl) {
+      try {
+        const form = new FormData();
+        appendFile(form, req.file.buffer, path.basename(filePath));
+        const url = `${baseUrl.replace(/\/$/, "")}/upload_resumes`;
+        const response = await axios.post(url, form, {
+          headers: form.getHeaders(),
+          timeout: 30000,
+          maxContentLength: Infinity,
+          maxBodyLength: Infinity,
+        });
+        ingest = { status: "queued", ...response.data };
+      } catch (e) {
+        console.error("Ingest forward failed:", e.message);
+        ingest = { status: "failed", error: e.message };
+      }
+    }
+
     return res.status(200).json({
       message: "File uploaded successfully",
       filename: path.basename(filePath),
       parsed,
+      ingest,
     });
   } catch (err) {
     return res.status(500).json({ message: err.message || "Upload failed" });
@@ -81,28 +125,38 @@ router.post("/match_from_file", upload.single("file"), async (req, res) => {
 
     // Forward the file as multipart/form-data field 'file' to FastAPI
     const form = new FormData();
-    const fileStream = fs.createReadStream(req.file.path);
-    form.append("file", fileStream, {
-      filename: req.file.originalname || path.basename(req.file.path),
-      contentType: "application/json",
-    });
+    const filePath = saveUpload(req.file.buffer);
+    appendFile(form, req.file.buffer, req.file.originalname || path.basename(filePath));
     
     // Add num_candidates parameter if provided
     if (req.body.num_candidates) {
       form.append("num_candidates", req.body.num_candidates);
     }
 
-    const url = `${baseUrl.replace(/\/$/, "")}/match_from_file`;
+    // ?stream=ndjson|sse: pipe FastAPI's incremental response straight through
+    const stream = req.query.stream;
+    const query = stream ? `?stream=${encodeURIComponent(stream)}` : "";
+    const url = `${baseUrl.replace(/\/$/, "")}/match_from_file${query}`;
     const response = await axios.post(url, form, {
       headers: form.getHeaders(),
       timeout: 60000,
       maxContentLength: Infinity,
       maxBodyLength: Infinity,
+      responseType: stream ? "stream" : "json",
     });
+    if (stream) {
+      res.status(response.status);
+      res.setHeader("Content-Type", response.headers["content-type"] || "application/x-ndjson");
+      res.setHeader("Cache-Control", "no-cache");
+      return response.data.pipe(res);
+    }
     return res.status(200).json(response.data);
   } catch (err) {
     const status = err.response?.status || 500;
     const message = err.response?.data || { message: err.message || "Match from file failed" };
+    if (typeof message.pipe === "function") {
+      return message.pipe(res.status(status));
+    }
     return res.status(status).json(message);
   }
 });
@@ -122,7 +176,12 @@ router.post("/match_internship", async (req, res) => {
     }
 
     const url = `${baseUrl.replace(/\/$/, "")}/match_internship`;
-    const response = await axios.post(url, payload, { timeout: 30000 });
+    const body = JSON.stringify(payload);
+    const gzip = gzipForward();
+    const response = await axios.post(url, gzip ? zlib.gzipSync(body) : body, {
+      headers: { "Content-Type": "application/json", ...(gzip && { "Content-Encoding": "gzip" }) },
+      timeout: 30000,
+    });
     return res.status(200).json(response.data);
   } catch (err) {
     const status = err.response?.status || 500;
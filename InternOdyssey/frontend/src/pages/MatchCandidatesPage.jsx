@@ -1,5 +1,20 @@
 import { useState } from 'react';
-import axios from 'axios';
+
+// Reads an NDJSON response line by line, calling onEvent for each parsed object
+const readNdjson = async (response, onEvent) => {
+  const reader = response.body.getReader();
+  const decoder = new TextDecoder();
+  let buffer = '';
+  for (;;) {
+    const { done, value } = await reader.read();
+    buffer += decoder.decode(value || new Uint8Array(), { stream: !done });
+    const lines = buffer.split('\n');
+    buffer = lines.pop();
+    lines.filter((line) => line.trim()).forEach((line) => onEvent(JSON.parse(line)));
+    if (done) break;
+  }
+  if (buffer.trim()) onEvent(JSON.parse(buffer));
+};
 
 const MatchCandidatesPage = () => {
   const [matchFile, setMatchFile] = useState(null);
@@ -28,16 +43,35 @@ const MatchCandidatesPage = () => {
     formData.append('file', matchFile);
     
     try {
-      const response = await axios.post('/api/match_from_file', formData, {
-        headers: {
-          'Content-Type': 'multipart/form-data'
+      // Streamed so the table fills in as candidates arrive instead of after the whole match
+      const response = await fetch('/api/match_from_file?stream=ndjson', {
+        method: 'POST',
+        body: formData
+      });
+      if (!response.ok) {
+        const data = await response.json().catch(() => ({}));
+        throw new Error(data.message || data.error || 'Failed to match candidates');
+      }
+      // Backends without streaming (bc.py, updated_bc.py) answer with one JSON body
+      const contentType = response.headers.get('content-type') || '';
+      if (!contentType.includes('ndjson')) {
+        setMatchResults(await response.json());
+        return;
+      }
+
+      setMatchResults({ selected: [], total: null });
+      await readNdjson(response, (event) => {
+        if (event.type === 'meta') {
+          setMatchResults((prev) => ({ ...prev, total: event.total, message: event.message }));
+        } else if (event.type === 'candidate') {
+          setMatchResults((prev) => ({ ...prev, selected: [...prev.selected, event.candidate] }));
+        } else if (event.type === 'done') {
+          setMatchResults((prev) => ({ ...prev, quotas: event.quotas }));
         }
       });
-      
-      setMatchResults(response.data);
     } catch (err) {
       console.error('Error matching candidates:', err);
-      setError(err.response?.data?.message || 'Failed to match candidates');
+      setError(err.message || 'Failed to match candidates');
     } finally {
       setLoading(false);
     }
@@ -89,11 +123,18 @@ const MatchCandidatesPage = () => {
         <div className="bg-white p-6 rounded-lg shadow-md mt-8">
           <h2 className="text-2xl font-semibold mb-6">Match Results</h2>
           
-          {matchResults.selected?.length === 0 ? (
+          {matchResults.selected?.length === 0 && !loading ? (
             <p className="text-gray-600">No candidates matched your criteria.</p>
           ) : (
             <div>
-              <p className="mb-4 text-green-700">Successfully matched {matchResults.selected?.length || 0} candidates!</p>
+              {loading ? (
+                <p className="mb-4 text-gray-600">
+                  Received {matchResults.selected?.length || 0}
+                  {matchResults.total != null && ` of ${matchResults.total}`} candidates...
+                </p>
+              ) : (
+                <p className="mb-4 text-green-700">Successfully matched {matchResults.selected?.length || 0} candidates!</p>
+              )}
               
               <div className="overflow-x-auto">
                 <table className="min-w-full divide-y divide-gray-200">
@@ -0,0 +1,100 @@
+# allocation.py
+import heapq
+import numpy as np
+from candidate_table import base_components, with_semantic
+from scoring_rules import rule_mask
+
+def score_matrix(table, rows, embeddings, internships, job_embeddings, score_args):
+    """
+    (K, N) final scores plus per-job component dicts for K internships against
+    the N pool rows. Semantic similarity for all pairs is one matmul.
+    """
+    sem = job_embeddings @ embeddings.T
+    components = []
+    for k, internship in enumerate(internships):
+        base, partial = base_components(table, rows, internship, *score_args)
+        components.append(with_semantic(base, partial, sem[k], score_args[0]))
+    scores = np.stack([c["final_score"] for c in components]) if components else np.zeros((0, rows.size))
+    # Candidates a job's rules exclude can never be assigned to it
+    for k, internship in enumerate(internships):
+        keep = rule_mask(table, rows, internship)
+        if keep is not None:
+            scores[k, ~keep] = -np.inf
+    return scores, components
+
+
+def _merge_streams(queues, scores, owner, seats, on_pick):
+    """
+    K-way merge of per-job candidate streams ordered by score.
+    queues: per job, a list of streams [order array, position, seats left or None]
+    taken in turn: a job's next stream starts once its current one is filled or
+    runs out. Always assigns the globally best (job, candidate) pair among the
+    jobs' current streams next. on_pick may lower the seats left of a job's later
+    streams (overlapping quotas).
+    """
+    heap = []
+
+    def push(job):
+        while queues[job]:
+            stream = queues[job][0]
+            order, pos, left = stream
+            if seats[job] > 0 and (left is None or left > 0):
+                while pos < order.size and (owner[order[pos]] >= 0 or scores[job, order[pos]] == -np.inf):
+                    pos += 1  # already placed elsewhere, or excluded from this job
+                stream[1] = pos
+                if pos < order.size:
+                    heapq.heappush(heap, (-scores[job, order[pos]], job))
+                    return
+            queues[job].pop(0)  # filled or exhausted: move on to the job's next stream
+
+    for job in range(len(queues)):
+        push(job)
+    while heap:
+        _, job = heapq.heappop(heap)
+        stream = queues[job][0]
+        cand = stream[0][stream[1]]
+        if owner[cand] < 0:
+            owner[cand] = job
+            seats[job] -= 1
+            on_pick(job, cand)
+            stream[1] += 1
+        push(job)
+
+
+def allocate(scores, internships, constraints):
+    """
+    Capacity- and quota-constrained greedy assignment; every candidate gets at
+    most one internship. Each job fills its quotas first, scarcest first as
+    quotas.select_with_quotas does, with jobs competing for candidates best pair
+    first; then remaining capacity goes to the best remaining pairs. For a single
+    job this selects exactly what select_with_quotas does.
+    Returns the job index per candidate (-1 = unassigned) and per-job picks.
+    """
+    k_jobs, n = scores.shape
+    owner = np.full(n, -1, dtype=np.int64)
+    seats = [int(internship['capacity']) for internship in internships]
+    picks = [[] for _ in range(k_jobs)]
+
+    quota_queues = []
+    tracked = []  # per job: (stream, mask) of each quota
+    for job in range(k_jobs):
+        by_scarcity = sorted(constraints[job], key=lambda c: c[0].sum() - c[1])
+        queue = []
+        for mask, needed, _ in by_scarcity:
+            members = np.flatnonzero(mask)
+            queue.append([members[np.argsort(-scores[job, members], kind="stable")], 0, needed])
+        quota_queues.append(queue)
+        tracked.append([(stream, mask) for stream, (mask, _, _) in zip(queue, by_scarcity)])
+
+    def on_pick(job, cand):
+        picks[job].append(int(cand))
+        # A pick counts towards every quota of that job it satisfies
+        for stream, mask in tracked[job]:
+            if mask[cand]:
+                stream[2] -= 1
+
+    _merge_streams(quota_queues, scores, owner, seats, on_pick)
+
+    open_queues = [[[np.argsort(-scores[job], kind="stable"), 0, None]] for job in range(k_jobs)]
+    _merge_streams(open_queues, scores, owner, seats, on_pick)
+    return owner, picks
@@ -0,0 +1,44 @@
+# anytime.py
+import time
+import numpy as np
+from quotas import QuotaShortlist, top_k
+from stream_match import can_place
+
+ANYTIME_BATCH = 256  # rows embedded between deadline checks
+
+
+def anytime_scores(partial, masks, internship, semantic_weight, score, deadline, free=None,
+                   batch_size=ANYTIME_BATCH):
+    """
+    Semantic similarity for rows in priority order (best upper bound first) until
+    `deadline` (time.monotonic()) passes or no unscored row can still be selected.
+    score(positions) -> similarities. The first batch is always scored: the top
+    `capacity` and the top `seats` of every quota group by bound, so the selection
+    is full and quotas can be met, plus the `free` rows (embeddings already cached).
+    Returns (sem_sim with NaN where not scored, rows left undecided); 0 undecided
+    means the selection is exactly what scoring every row would give.
+    """
+    n = partial.size
+    sem_sim = np.full(n, np.nan, dtype=np.float32)
+    shortlist = QuotaShortlist(internship)
+
+    order = np.argsort(-partial, kind="stable")
+    first = np.zeros(n, dtype=bool)
+    first[order[:shortlist.capacity]] = True
+    for c, seats in enumerate(shortlist.seats):
+        first[top_k(np.flatnonzero(masks[c]), partial, seats)] = True
+    if free is not None:
+        first |= free
+    batch, pending = np.flatnonzero(first), order[~first[order]]
+
+    while True:
+        if batch.size:
+            sem_sim[batch] = score(batch)
+            final = np.maximum(0.0, partial[batch] + semantic_weight * sem_sim[batch])
+            shortlist.merge(batch.tolist(), {"final_score": final}, masks[:, batch])
+        if pending.size:
+            # Rows that can no longer beat the scored ones are decided without embedding them
+            pending = pending[can_place(shortlist, masks[:, pending], partial[pending], semantic_weight)]
+        if pending.size == 0 or time.monotonic() >= deadline:
+            return sem_sim, int(pending.size)
+        batch, pending = pending[:batch_size], pending[batch_size:]
@@ -11,10 +11,10 @@ from pyngrok import ngrok
 # ==============================
 # Configurable weights & bonuses
 # ==============================
-WEIGHTS = {"skill": 0.5, "semantic": 0.3, "location": 0.1, "experience": 0.1}
-RURAL_BONUS = 0.1
-SOCIAL_BONUS = {"SC": 0.08, "ST": 0.1, "OBC": 0.05, "General": 0.0}
-PAST_PARTICIPATION_PENALTY = 0.15
+from weights import WEIGHTS, RURAL_BONUS, SOCIAL_BONUS, PAST_PARTICIPATION_PENALTY, TARGETED_SOCIAL_BONUS
+from experience import experience_score
+from locations import location_score
+from skill_vocab import skills_match_fraction
 
 # ==============================
 # FastAPI app
@@ -49,28 +49,6 @@ def profile_to_text(profile: dict) -> str:
         parts.append("Certifications: " + ", ".join(profile['certifications']))
     return ". ".join(parts)
 
-def skills_match_fraction(candidate_skills, req_skills):
-    return sum(1 for s in req_skills if s in candidate_skills) / len(req_skills)
-
-def location_score(candidate_loc, req_loc):
-    return 1.0 if candidate_loc.strip().lower() == req_loc.strip().lower() else 0.0
-
-def experience_score(candidate_exp):
-    """Freshers get 1, otherwise reduce score"""
-    if not candidate_exp:
-        return 1.0
-    exp_text = " ".join(candidate_exp) if isinstance(candidate_exp, list) else candidate_exp
-    exp_text = exp_text.lower()
-    if "fresher" in exp_text or "months" in exp_text:
-        return 1.0
-    if "1 year" in exp_text:
-        return 0.9
-    if "2 year" in exp_text:
-        return 0.6
-    if "research" in exp_text:
-        return 0.8
-    return 0.5
-
 def compute_hybrid_score(cand, intern_emb, cand_emb, internship):
     skill_frac = skills_match_fraction(cand['skills'], internship['required_skills'])
     sem_sim = util.pytorch_cos_sim(cand_emb, intern_emb).item()
@@ -89,7 +67,7 @@ def compute_hybrid_score(cand, intern_emb, cand_emb, internship):
     if cand.get('past_participation', False):
         adj -= PAST_PARTICIPATION_PENALTY
     if internship.get('targeted_social') and cand.get('social') == internship['targeted_social']:
-        adj += 0.06
+        adj += TARGETED_SOCIAL_BONUS
     final_score = max(0.0, base + adj)
     breakdown = {
         "skill_frac": skill_frac,
@@ -0,0 +1,197 @@
+# candidate_table.py
+import numpy as np
+from experience import experience_points, parse_column
+from locations import LOCATION_IDS, intern_location, location_affinity, location_id
+from skill_vocab import VOCAB, match_counts, normalize_skill
+from weights import TARGETED_SOCIAL_BONUS
+import scoring_rules  # module import: scoring_rules reads the interning functions here
+
+# ==============================
+# Interned codes
+# ==============================
+SOCIAL_CATEGORIES = ["General", "OBC", "SC", "ST", "Other"]
+SOCIAL_CODES = {name: code for code, name in enumerate(SOCIAL_CATEGORIES)}
+OTHER_SOCIAL = SOCIAL_CODES["Other"]
+
+def social_code(social):
+    """Code of a social category; anything outside SOCIAL_CATEGORIES shares the "Other"
+    code, so request input never grows the list"""
+    return SOCIAL_CODES.get(social, OTHER_SOCIAL)
+
+
+def field(record, name, default=None):
+    """Read a field from a dict, pydantic model or any attribute-style record"""
+    if isinstance(record, dict):
+        return record.get(name, default)
+    return getattr(record, name, default)
+
+
+# ==============================
+# Candidate table
+# ==============================
+class CandidateTable:
+    """
+    Struct-of-arrays view of a candidate pool. Scoring and selection work on the
+    columns; the original records are only turned into response dicts for the
+    candidates that get selected.
+    """
+
+    __slots__ = (
+        "records", "ids", "skill_bits", "location", "social", "rural",
+        "past_participation", "has_experience", "fresher", "experience_months", "research",
+        "experience", "emb_row"
+    )
+
+    def __init__(self, records):
+        n = len(records)
+        self.records = records
+        self.ids = np.fromiter((field(r, "id") for r in records), dtype=np.int64, count=n)
+        self.skill_bits = VOCAB.bitsets(field(r, "skills", []) or [] for r in records)
+        self.location = np.fromiter(
+            (intern_location(field(r, "location", "") or "") for r in records), dtype=np.int32, count=n
+        )
+        self.social = np.fromiter(
+            (social_code(field(r, "social", "General")) for r in records), dtype=np.int16, count=n
+        )
+        self.rural = np.fromiter((bool(field(r, "rural", False)) for r in records), dtype=bool, count=n)
+        self.past_participation = np.fromiter(
+            (bool(field(r, "past_participation", False)) for r in records), dtype=bool, count=n
+        )
+        self.has_experience = np.fromiter(
+            (bool(field(r, "has_experience", False)) for r in records), dtype=bool, count=n
+        )
+        # Experience text is parsed once here; scoring only reads the numeric columns
+        self.experience_months, self.research, self.fresher = parse_column(
+            (field(r, "experience") for r in records), n
+        )
+        self.experience = experience_points(self.experience_months, self.research, self.fresher).astype(np.float32)
+        self.emb_row = np.full(n, -1, dtype=np.int32)
+
+    @classmethod
+    def from_columns(cls, records, columns):
+        """Table over precomputed columns (e.g. a snapshot); records are only read on materialize"""
+        table = cls.__new__(cls)
+        table.records = records
+        for name, values in columns.items():
+            setattr(table, name, values)
+        table.emb_row = np.full(len(records), -1, dtype=np.int32)
+        return table
+
+    def __len__(self):
+        return len(self.records)
+
+    def materialize(self, i, breakdown, final_score=None):
+        """Response dict for row i (only called for selected candidates).
+        breakdown=None gives the compact form with final_score only"""
+        r = self.records[i]
+        out = {
+            "id": field(r, "id"),
+            "name": field(r, "name"),
+            "skills": field(r, "skills"),
+            "location": field(r, "location", "Unknown"),
+            "experience": field(r, "experience", []),
+            "social": field(r, "social", "General"),
+            "rural": field(r, "rural", False),
+            "past_participation": field(r, "past_participation", False),
+            "final_score": breakdown["final_score"] if breakdown is not None else float(final_score)
+        }
+        if breakdown is not None:
+            out["breakdown"] = breakdown
+        return out
+
+
+# ==============================
+# Vectorized scoring
+# ==============================
+def skill_fraction(table, rows, required_skills):
+    """Fraction of the (normalized, de-duplicated) required skills each row has"""
+    required = VOCAB.bitset(required_skills)
+    total = len({normalize_skill(s) for s in required_skills})
+    if total == 0:
+        return np.zeros(len(rows), dtype=np.float32)
+    return (match_counts(table.skill_bits[rows], required) / total).astype(np.float32)
+
+
+def base_components(table, rows, internship, weights, rural_bonus, social_bonus, past_penalty):
+    """
+    Every score component except semantic similarity. Returns (components, partial)
+    where partial is the weighted sum of these components before clamping at 0.
+    """
+    skill_frac = skill_fraction(table, rows, internship['required_skills'])
+    loc = location_affinity(table.location[rows], location_id(internship['location']))
+    exp = table.experience[rows]
+    social = table.social[rows]
+
+    social_lookup = np.array(
+        [social_bonus.get(name, 0.0) for name in SOCIAL_CATEGORIES], dtype=np.float32
+    )
+    social_b = social_lookup[social]
+    rural_b = np.where(table.rural[rows], rural_bonus, 0.0).astype(np.float32)
+    past_p = np.where(table.past_participation[rows], past_penalty, 0.0).astype(np.float32)
+
+    adj = rural_b + social_b - past_p
+    targeted = internship.get('targeted_social')
+    if targeted:
+        adj = adj + np.where(social == social_code(targeted), TARGETED_SOCIAL_BONUS, 0.0).astype(np.float32)
+
+    # Per-internship bonuses/penalties (see scoring_rules)
+    rule_b = scoring_rules.rule_bonus(table, rows, internship)
+    if rule_b is not None:
+        adj = adj + rule_b
+
+    partial = (
+        weights['skill'] * skill_frac
+        + weights['location'] * loc
+        + weights['experience'] * exp
+        + adj
+    )
+    components = {
+        "skill_frac": skill_frac,
+        "location": loc,
+        "experience": exp,
+        "social_bonus": social_b,
+        "rural_bonus": rural_b,
+        "past_penalty": past_p,
+    }
+    if rule_b is not None:
+        components["rule_bonus"] = rule_b
+    return components, partial
+
+
+def with_semantic(components, partial, sem_sim, weights):
+    """Add semantic similarity to base_components output and compute final_score"""
+    out = {"skill_frac": components["skill_frac"], "semantic_sim": sem_sim}
+    out.update((name, values) for name, values in components.items() if name != "skill_frac")
+    out["final_score"] = np.maximum(0.0, partial + weights['semantic'] * sem_sim)
+    return out
+
+
+def score_table(table, rows, sem_sim, internship, weights, rural_bonus, social_bonus, past_penalty):
+    """
+    Hybrid score for the given rows of the table. sem_sim holds the cosine similarity
+    of each row to the internship. Returns a dict of per-row component arrays.
+    """
+    components, partial = base_components(
+        table, rows, internship, weights, rural_bonus, social_bonus, past_penalty
+    )
+    return with_semantic(components, partial, sem_sim, weights)
+
+
+def prune_by_bound(partial, semantic_weight, capacity):
+    """
+    Mask of rows that can still make the top `capacity` whatever their semantic
+    similarity turns out to be. Cosine similarity is in [-1, 1], so each row's final
+    score lies in [partial - w, partial + w]; a row whose best case is below the
+    capacity-th best worst case can never be selected.
+    """
+    if capacity <= 0 or partial.size <= capacity:
+        return np.ones(partial.size, dtype=bool)
+    lower = np.maximum(0.0, partial - semantic_weight)
+    upper = np.maximum(0.0, partial + semantic_weight)
+    threshold = np.partition(lower, partial.size - capacity)[partial.size - capacity]
+    return upper >= threshold
+
+
+def breakdown_at(components, j):
+    """Plain-float breakdown dict for position j of the component arrays"""
+    return {name: float(values[j]) for name, values in components.items()}
@@ -0,0 +1,95 @@
+# cascade.py
+import threading
+from collections import OrderedDict
+import numpy as np
+from sentence_transformers import CrossEncoder, SentenceTransformer
+from torch.nn import Identity
+from encoder import BucketedEncoder
+from ingest import text_key
+from quotas import top_k
+
+# ==============================
+# Config
+# ==============================
+CASCADE_DEPTH = 300  # candidates re-scored by the second stage, by default
+RERANK_CACHE_SIZE = 1 << 15  # bi-encoder profile vectors kept (by text hash, least recently used dropped)
+RERANK_MODELS = {
+    "mpnet": ("all-mpnet-base-v2", False),                    # bi-encoder, vectors cached per profile
+    "cross": ("cross-encoder/ms-marco-MiniLM-L-6-v2", True),  # scores each (job, profile) pair
+}
+
+
+def cascade_shortlist(scores, constraints, capacity, depth):
+    """
+    Positions worth re-scoring after the first stage: the top max(depth, capacity) by
+    score, plus for every quota group its best members to the same relative depth
+    (at least its seats), so the reranked shortlist can still fill the capacity and
+    every quota.
+    """
+    depth = max(depth, capacity)
+    keep = np.zeros(scores.size, dtype=bool)
+    keep[top_k(np.arange(scores.size), scores, depth)] = True
+    for mask, seats, _ in constraints:
+        keep[top_k(np.flatnonzero(mask), scores, -(-seats * depth // max(1, capacity)))] = True
+    return np.flatnonzero(keep)
+
+
+class Reranker:
+    """
+    Second-stage semantic similarity from a slower, better model, loaded on first
+    use. A bi-encoder (mpnet) keeps its profile vectors in a bounded LRU cache, so a
+    profile is usually only encoded once whatever the job; a cross-encoder scores each
+    (description, profile) pair. Both return similarities on the cosine scale
+    [-1, 1], so they drop into the hybrid score in place of the MiniLM value.
+    """
+
+    def __init__(self, name, text_fn, cross=False):
+        self.name = name
+        self.text_fn = text_fn
+        self.cross = cross
+        self.model = None
+        self.encoder = None
+        self.cache = OrderedDict()  # text hash -> normalized vector
+        self.lock = threading.Lock()
+
+    def _load(self):
+        with self.lock:
+            if self.model is None:
+                print(f"[INFO] Loading rerank model {self.name}...")
+                if self.cross:
+                    self.model = CrossEncoder(self.name)
+                else:
+                    self.model = SentenceTransformer(self.name)
+                    self.encoder = BucketedEncoder(self.model)
+        return self.model
+
+    def similarity(self, query, records):
+        model = self._load()
+        texts = [self.text_fn(r) for r in records]
+        if self.cross:
+            # Raw logits (no activation), squashed the same way whatever the batch
+            logits = np.asarray(
+                model.predict([(query, t) for t in texts], activation_fn=Identity()), dtype=np.float32
+            )
+            return 2.0 / (1.0 + np.exp(-logits)) - 1.0
+
+        keys = [text_key(t) for t in texts]
+        with self.lock:
+            vectors = [self.cache.get(key) for key in keys]
+            for key, vector in zip(keys, vectors):
+                if vector is not None:
+                    self.cache.move_to_end(key)
+            missing = [j for j, vector in enumerate(vectors) if vector is None]
+            if missing:
+                encoded = self.encoder.encode([texts[j] for j in missing], [keys[j] for j in missing])
+                for j, vector in zip(missing, encoded):
+                    vectors[j] = self.cache[keys[j]] = vector
+                while len(self.cache) > RERANK_CACHE_SIZE:
+                    self.cache.popitem(last=False)
+        query_vector = model.encode(query, convert_to_numpy=True, normalize_embeddings=True)
+        return np.stack(vectors) @ query_vector
+
+
+def rerankers(text_fn):
+    """One lazily loaded Reranker per RERANK_MODELS entry"""
+    return {key: Reranker(name, text_fn, cross) for key, (name, cross) in RERANK_MODELS.items()}
@@ -0,0 +1,254 @@
+# compression.py
+import gzip
+import hashlib
+import os
+import zlib
+
+try:
+    import zstandard
+except ImportError:  # zstd is optional; gzip always works
+    zstandard = None
+
+GZIP_MAGIC = b"\x1f\x8b"
+ZSTD_MAGIC = b"\x28\xb5\x2f\xfd"
+
+# Responses smaller than this are not worth compressing
+MIN_COMPRESS_SIZE = 1024
+GZIP_LEVEL = 6
+ZSTD_LEVEL = 3
+
+# How stored uploads are kept in UPLOAD_DIR
+STORAGE_ENCODING = "zstd" if zstandard is not None else "gzip"
+SUFFIXES = {"gzip": ".gz", "zstd": ".zst"}
+UPLOAD_SUFFIXES = (".json", ".json.gz", ".json.zst")
+
+# Never compressed by the middleware: already compressed, or must reach the client
+# event by event (SSE)
+SKIP_CONTENT_TYPES = ("text/event-stream", "application/gzip", "application/zstd")
+
+
+def available_encodings():
+    return ("zstd", "gzip") if zstandard is not None else ("gzip",)
+
+
+def sniff(data):
+    """Encoding of a payload from its magic bytes (None = not compressed)"""
+    if data[:2] == GZIP_MAGIC:
+        return "gzip"
+    if data[:4] == ZSTD_MAGIC:
+        return "zstd"
+    return None
+
+
+def decompress(data, encoding=None):
+    """Decode a gzip/zstd payload; encoding=None sniffs it, plain bytes pass through"""
+    encoding = (encoding or "").strip().lower() or sniff(data)
+    if encoding in (None, "identity"):
+        return data
+    if encoding in ("gzip", "x-gzip"):
+        return gzip.decompress(data)
+    if encoding == "zstd":
+        if zstandard is None:
+            raise ValueError("zstd payload received but the zstandard package is not installed")
+        # stream_reader copes with frames that do not record their content size
+        with zstandard.ZstdDecompressor().stream_reader(data) as reader:
+            return reader.read()
+    raise ValueError(f"Unsupported content encoding: {encoding}")
+
+
+def open_stream(fileobj):
+    """Binary reader over a seekable file object that decompresses gzip/zstd content on
+    the fly (plain content passes through), for inputs too large to read at once"""
+    encoding = sniff(fileobj.read(4))
+    fileobj.seek(0)
+    if encoding == "gzip":
+        return gzip.GzipFile(fileobj=fileobj, mode="rb")
+    if encoding == "zstd":
+        if zstandard is None:
+            raise ValueError("zstd payload received but the zstandard package is not installed")
+        return zstandard.ZstdDecompressor().stream_reader(fileobj)
+    return fileobj
+
+
+def compress(data, encoding=STORAGE_ENCODING):
+    if encoding == "gzip":
+        return gzip.compress(data, compresslevel=GZIP_LEVEL)
+    if encoding == "zstd":
+        return zstandard.ZstdCompressor(level=ZSTD_LEVEL).compress(data)
+    return data
+
+
+def negotiate(accept_encoding):
+    """Best encoding we support from an Accept-Encoding header, or None"""
+    offered = {}
+    for part in (accept_encoding or "").split(","):
+        name, _, params = part.strip().partition(";")
+        q = 1.0
+        if params.strip().startswith("q="):
+            try:
+                q = float(params.strip()[2:])
+            except ValueError:
+                q = 0.0
+        offered[name.strip().lower()] = q
+    for encoding in available_encodings():
+        if offered.get(encoding, offered.get("*", 0.0)) > 0:
+            return encoding
+    return None
+
+
+class StreamCompressor:
+    """Incremental compressor; every chunk is flushed so streamed events still
+    arrive one by one"""
+
+    def __init__(self, encoding):
+        if encoding == "gzip":
+            self.obj = zlib.compressobj(GZIP_LEVEL, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+            self.sync = zlib.Z_SYNC_FLUSH
+        else:
+            self.obj = zstandard.ZstdCompressor(level=ZSTD_LEVEL).compressobj()
+            self.sync = zstandard.COMPRESSOBJ_FLUSH_BLOCK
+
+    def chunk(self, data):
+        return self.obj.compress(data) + self.obj.flush(self.sync)
+
+    def finish(self):
+        return self.obj.flush()
+
+
+# ==============================
+# Stored uploads
+# ==============================
+def is_upload(filename):
+    return filename.endswith(UPLOAD_SUFFIXES)
+
+
+def stored_name(content):
+    """Content-addressed name of an upload in UPLOAD_DIR: identical bytes, one file"""
+    return hashlib.sha256(content).hexdigest()[:32] + ".json" + SUFFIXES[STORAGE_ENCODING]
+
+
+def write_upload(path, content):
+    """Store raw upload bytes compressed unless the same content is already stored.
+    An existing file is touched instead, so its mtime still orders it as the latest
+    upload. Returns True if a new file was written."""
+    if os.path.exists(path):
+        os.utime(path)
+        return False
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "wb") as f:
+        f.write(compress(content))
+    os.replace(tmp, path)
+    return True
+
+
+def read_upload(path):
+    with open(path, "rb") as f:
+        return decompress(f.read())
+
+
+# ==============================
+# ASGI middleware
+# ==============================
+class CompressionMiddleware:
+    """
+    Request side: decodes bodies sent with Content-Encoding: gzip / zstd, so endpoints
+    always see plain bytes. Response side: compresses with the best encoding the client
+    accepts (zstd, then gzip); streamed responses are compressed chunk by chunk.
+    """
+
+    def __init__(self, app, minimum_size=MIN_COMPRESS_SIZE):
+        self.app = app
+        self.minimum_size = minimum_size
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+        headers = {k.decode("latin-1").lower(): v.decode("latin-1") for k, v in scope["headers"]}
+
+        request_encoding = headers.get("content-encoding", "").strip().lower()
+        if request_encoding and request_encoding != "identity":
+            chunks = []
+            more = True
+            while more:
+                message = await receive()
+                chunks.append(message.get("body", b""))
+                more = message.get("more_body", False)
+            try:
+                body = decompress(b"".join(chunks), request_encoding)
+            except Exception as e:
+                return await _plain_response(send, 400, f"Could not decode {request_encoding} body: {e}")
+            scope = dict(scope)
+            scope["headers"] = [
+                (k, v) for k, v in scope["headers"]
+                if k.lower() not in (b"content-encoding", b"content-length")
+            ] + [(b"content-length", str(len(body)).encode())]
+            delivered = False
+
+            async def receive():
+                nonlocal delivered
+                if delivered:
+                    return {"type": "http.disconnect"}
+                delivered = True
+                return {"type": "http.request", "body": body, "more_body": False}
+
+        encoding = negotiate(headers.get("accept-encoding"))
+        if encoding is None:
+            return await self.app(scope, receive, send)
+        await self.app(scope, receive, _CompressingSend(send, encoding, self.minimum_size))
+
+
+class _CompressingSend:
+    def __init__(self, send, encoding, minimum_size):
+        self.send = send
+        self.encoding = encoding
+        self.minimum_size = minimum_size
+        self.start = None
+        self.compressor = None
+        self.passthrough = False
+
+    async def __call__(self, message):
+        if message["type"] == "http.response.start":
+            headers = {k.lower(): v for k, v in message.get("headers", [])}
+            content_type = headers.get(b"content-type", b"").decode("latin-1")
+            self.passthrough = b"content-encoding" in headers or content_type.startswith(SKIP_CONTENT_TYPES)
+            if self.passthrough:
+                return await self.send(message)
+            self.start = message
+            return
+        if message["type"] != "http.response.body" or self.passthrough:
+            return await self.send(message)
+
+        body = message.get("body", b"")
+        more = message.get("more_body", False)
+        if self.start is not None:
+            start, self.start = self.start, None
+            if not more and len(body) < self.minimum_size:
+                self.passthrough = True
+                await self.send(start)
+                return await self.send(message)
+            headers = [
+                (k, v) for k, v in start.get("headers", []) if k.lower() != b"content-length"
+            ]
+            headers += [(b"content-encoding", self.encoding.encode()), (b"vary", b"Accept-Encoding")]
+            if not more:
+                body = compress(body, self.encoding)
+                headers.append((b"content-length", str(len(body)).encode()))
+                await self.send({**start, "headers": headers})
+                return await self.send({"type": "http.response.body", "body": body})
+            self.compressor = StreamCompressor(self.encoding)
+            await self.send({**start, "headers": headers})
+
+        data = self.compressor.chunk(body) if body else b""
+        if not more:
+            data += self.compressor.finish()
+        await self.send({"type": "http.response.body", "body": data, "more_body": more})
+
+
+async def _plain_response(send, status, text):
+    body = text.encode("utf-8")
+    await send({
+        "type": "http.response.start",
+        "status": status,
+        "headers": [(b"content-type", b"text/plain; charset=utf-8"), (b"content-length", str(len(body)).encode())],
+    })
+    await send({"type": "http.response.body", "body": body})
@@ -0,0 +1,134 @@
+# encoder.py
+import hashlib
+import threading
+from collections import OrderedDict
+import numpy as np
+
+# ==============================
+# Config
+# ==============================
+BATCH_TOKENS = 8192        # padded tokens per forward pass (batch size x longest text)
+MAX_BATCH = 128            # texts per forward pass whatever their length
+CHUNK_OVERLAP = 32         # tokens shared by consecutive chunks of an over-long text
+TOKEN_CACHE_SIZE = 1 << 17  # cached token counts (by text hash)
+
+
+class BucketedEncoder:
+    """
+    Front-end for model.encode over texts of very different lengths. Texts are
+    tokenized once (counts are cached by text hash), sorted by token count and
+    cut into batches holding about BATCH_TOKENS padded tokens each, so short
+    profiles go through in large batches and long ones in small batches instead
+    of everything being padded to the longest text of a fixed-size batch. Texts
+    longer than the model's max sequence length are split into overlapping
+    chunks whose embeddings are averaged (weighted by tokens), instead of
+    silently losing everything after the limit.
+    Returns the same (N, D) normalized float32 array as model.encode.
+    """
+
+    def __init__(self, model, batch_tokens=BATCH_TOKENS, max_batch=MAX_BATCH, overlap=CHUNK_OVERLAP):
+        self.model = model
+        self.tokenizer = getattr(model, "tokenizer", None)
+        self.max_length = model.get_max_seq_length() if self.tokenizer is not None else None
+        self.batch_tokens = batch_tokens
+        self.max_batch = max_batch
+        self.overlap = overlap
+        self.counts = OrderedDict()  # text hash -> token count (special tokens included)
+        self.lock = threading.Lock()
+        self.stats = {"texts": 0, "chunked": 0, "batches": 0, "tokens": 0, "padded_tokens": 0}
+
+    def _special(self):
+        return self.tokenizer.num_special_tokens_to_add(pair=False)
+
+    def token_counts(self, texts, keys=None):
+        """Token count of every text, tokenizing only texts not seen before; keys are
+        the texts' hashes if the caller has them. Returns (counts, {index: token ids}
+        for the texts that were tokenized)"""
+        if keys is None:
+            keys = [hashlib.sha1(t.encode("utf-8")).digest() for t in texts]
+        counts = np.empty(len(texts), dtype=np.int64)
+        missing = []
+        with self.lock:
+            for i, key in enumerate(keys):
+                count = self.counts.get(key)
+                if count is None:
+                    missing.append(i)
+                else:
+                    self.counts.move_to_end(key)
+                    counts[i] = count
+        ids = {}
+        if missing:
+            encoded = self.tokenizer(
+                [texts[i] for i in missing], add_special_tokens=False, truncation=False, verbose=False
+            )["input_ids"]
+            special = self._special()
+            with self.lock:
+                for i, token_ids in zip(missing, encoded):
+                    ids[i] = token_ids
+                    counts[i] = self.counts[keys[i]] = len(token_ids) + special
+                while len(self.counts) > TOKEN_CACHE_SIZE:
+                    self.counts.popitem(last=False)
+        return counts, ids
+
+    def _chunks(self, text, token_ids):
+        """Overlapping windows of an over-long text, as (chunk texts, their token counts)"""
+        if token_ids is None:
+            token_ids = self.tokenizer(text, add_special_tokens=False, truncation=False, verbose=False)["input_ids"]
+        special = self._special()
+        window = self.max_length - special
+        overlap = min(self.overlap, window // 4)
+        starts = range(0, max(1, len(token_ids) - overlap), window - overlap)
+        pieces = [token_ids[s:s + window] for s in starts]
+        return [self.tokenizer.decode(p) for p in pieces], [len(p) + special for p in pieces]
+
+    def encode(self, texts, keys=None):
+        if self.tokenizer is None or not self.max_length or not texts:
+            return self.model.encode(texts, convert_to_numpy=True, normalize_embeddings=True)
+        counts, ids = self.token_counts(texts, keys)
+
+        # Flatten: one unit per short text, one per chunk of a long text
+        units, unit_counts, owner = [], [], []
+        for i, text in enumerate(texts):
+            if counts[i] <= self.max_length:
+                units.append(text)
+                unit_counts.append(counts[i])
+                owner.append(i)
+            else:
+                pieces, piece_counts = self._chunks(text, ids.get(i))
+                units += pieces
+                unit_counts += piece_counts
+                owner += [i] * len(pieces)
+                self.stats["chunked"] += 1
+        unit_counts = np.array(unit_counts, dtype=np.int64)
+        owner = np.array(owner, dtype=np.int64)
+
+        # Length buckets: shortest first, each batch capped at batch_tokens padded tokens
+        order = np.argsort(unit_counts, kind="stable")
+        vectors = None
+        start = 0
+        while start < order.size:
+            stop = start + 1
+            while (stop < order.size and stop - start < self.max_batch
+                   and (stop - start + 1) * unit_counts[order[stop]] <= self.batch_tokens):
+                stop += 1
+            batch = order[start:stop]
+            out = self.model.encode(
+                [units[j] for j in batch], batch_size=batch.size,
+                convert_to_numpy=True, normalize_embeddings=True
+            )
+            if vectors is None:
+                vectors = np.empty((order.size, out.shape[1]), dtype=np.float32)
+            vectors[batch] = out
+            self.stats["batches"] += 1
+            self.stats["tokens"] += int(unit_counts[batch].sum())
+            self.stats["padded_tokens"] += int(unit_counts[batch[-1]]) * batch.size
+            start = stop
+        self.stats["texts"] += len(texts)
+
+        if owner.size == len(texts):
+            return vectors
+        # Pool chunk embeddings back into one vector per text (token-weighted mean)
+        pooled = np.zeros((len(texts), vectors.shape[1]), dtype=np.float32)
+        np.add.at(pooled, owner, vectors * unit_counts[:, None].astype(np.float32))
+        pooled /= np.linalg.norm(pooled, axis=1, keepdims=True)
+        return pooled
@@ -0,0 +1,73 @@
+# experience.py
+import re
+import numpy as np
+
+# ==============================
+# Parsing
+# ==============================
+# Durations like "6 months", "1 year", "1.5 yrs", "2+ years"; a bare "months" ("a few
+# months") counts as one month, it only has to land in the under-a-year band
+NUMBER = r"(\d+(?:\.\d+)?)\s*\+?\s*"
+YEARS = re.compile(NUMBER + r"(?:years?|yrs?)\b", re.IGNORECASE)
+MONTHS = re.compile(r"\b(?:" + NUMBER + r")?(?:months?|mos)\b", re.IGNORECASE)  # not "demos"
+RESEARCH = re.compile(r"research", re.IGNORECASE)
+FRESHER = re.compile(r"\bfresher\b", re.IGNORECASE)
+
+
+def experience_text(experience):
+    """Experience entries (a list, one string or None) as one string"""
+    if not experience:
+        return ""
+    return " ".join(experience) if isinstance(experience, (list, tuple)) else str(experience)
+
+
+def parse_experience(experience):
+    """
+    (months, research, fresher) for a candidate's experience field: total stated
+    duration in months (NaN when no duration is given), whether any entry mentions
+    research, and whether the candidate is a fresher (no entries, or "fresher"
+    without any stated duration).
+    """
+    text = experience_text(experience)
+    if not text.strip():
+        return np.nan, False, True
+    years = YEARS.findall(text)
+    months = MONTHS.findall(text)
+    total = sum(float(y) for y in years) * 12 + sum(float(m or 1) for m in months)
+    stated = bool(years or months)
+    return (
+        total if stated else np.nan,
+        RESEARCH.search(text) is not None,
+        not stated and FRESHER.search(text) is not None,
+    )
+
+
+def parse_column(records_experience, n):
+    """parse_experience over n experience fields -> (months, research, fresher) arrays"""
+    months = np.empty(n, dtype=np.float32)
+    research = np.empty(n, dtype=bool)
+    fresher = np.empty(n, dtype=bool)
+    for i, experience in enumerate(records_experience):
+        months[i], research[i], fresher[i] = parse_experience(experience)
+    return months, research, fresher
+
+
+# ==============================
+# Scoring
+# ==============================
+# Freshers and up to a year ("12 months") score best, then up to 2 and 3 years; beyond
+# that (or with no stated duration) research experience still counts for something
+def experience_points(months, research, fresher):
+    """Experience score from the parsed columns (arrays or scalars)"""
+    months = np.asarray(months, dtype=np.float32)
+    with np.errstate(invalid="ignore"):
+        return np.select(
+            [np.asarray(fresher) | (months <= 12), months < 24, months < 36, np.asarray(research)],
+            [1.0, 0.9, 0.6, 0.8],
+            0.5,
+        )
+
+
+def experience_score(candidate_exp):
+    """Experience score of one candidate's experience field (list or string)"""
+    return float(experience_points(*parse_experience(candidate_exp)))
@@ -0,0 +1,197 @@
+# ingest.py
+import hashlib
+import queue
+import threading
+import numpy as np
+from encoder import BucketedEncoder
+
+INGEST_BATCH_SIZE = 64
+
+# Defaults the scoring code assumes for optional candidate fields
+CANDIDATE_DEFAULTS = {
+    "skills": [],
+    "location": "Unknown",
+    "rural": False,
+    "social": "General",
+    "experience": [],
+    "past_participation": False,
+    "has_experience": False,
+}
+
+
+def normalize_candidate(candidate):
+    """Plain dict with every field the matcher reads present"""
+    record = dict(candidate) if isinstance(candidate, dict) else candidate.dict()
+    for key, default in CANDIDATE_DEFAULTS.items():
+        if record.get(key) is None:
+            record[key] = list(default) if isinstance(default, list) else default
+    return record
+
+
+def text_key(text):
+    return hashlib.sha1(text.encode("utf-8")).digest()
+
+
+# ==============================
+# Embedding store
+# ==============================
+class EmbeddingStore:
+    """Normalized embeddings of rendered profile texts, one row per distinct text"""
+
+    def __init__(self, dim=None):
+        self.dim = dim
+        self.vectors = None
+        self.size = 0
+        self.rows = {}      # text hash -> row
+        self.id_rows = {}   # candidate id -> row of its latest ingested text
+        self.lock = threading.Lock()
+
+    def __len__(self):
+        return self.size
+
+    def lookup(self, keys):
+        with self.lock:
+            return np.fromiter((self.rows.get(k, -1) for k in keys), dtype=np.int64, count=len(keys))
+
+    def load(self, vectors, keys, ids):
+        """Start from saved vectors (e.g. memory-mapped from a snapshot): row i holds the
+        text with hash keys[i] (uint8 matrix) of candidate ids[i]. Only on an empty store;
+        the first add() copies the vectors into a growable buffer."""
+        with self.lock:
+            self.vectors = vectors
+            self.size, self.dim = vectors.shape
+            raw, width = keys.tobytes(), keys.shape[1]
+            self.rows = {raw[i * width:(i + 1) * width]: i for i in range(self.size)}
+            self.id_rows = dict(zip(ids.tolist(), range(self.size)))
+
+    def add(self, keys, vectors):
+        """Append vectors for new keys; returns their rows"""
+        with self.lock:
+            out = np.empty(len(keys), dtype=np.int64)
+            for j, key in enumerate(keys):
+                row = self.rows.get(key)
+                if row is None:
+                    row = self.rows[key] = self._append(vectors[j])
+                out[j] = row
+            return out
+
+    def remember_ids(self, ids, rows):
+        with self.lock:
+            for candidate_id, row in zip(ids, rows):
+                self.id_rows[candidate_id] = int(row)
+
+    def forget_ids(self, ids):
+        with self.lock:
+            for candidate_id in ids:
+                self.id_rows.pop(candidate_id, None)
+
+    def take(self, rows):
+        """Copy of the vectors at rows (safe against concurrent growth)"""
+        with self.lock:
+            return self.vectors[rows]
+
+    def _append(self, vector):
+        if self.vectors is None:
+            self.dim = vector.shape[-1]
+            self.vectors = np.empty((1024, self.dim), dtype=np.float32)
+        elif self.size == self.vectors.shape[0]:
+            grown = np.empty((max(1024, self.vectors.shape[0] * 2), self.dim), dtype=np.float32)
+            grown[:self.size] = self.vectors[:self.size]
+            self.vectors = grown
+        self.vectors[self.size] = vector
+        self.size += 1
+        return self.size - 1
+
+
+# ==============================
+# Ingest pipeline
+# ==============================
+class IngestPipeline:
+    """
+    Renders and embeds candidates once, off the request path. Uploads call submit();
+    a background worker embeds them in batches. Match requests call rows_for(), which
+    only encodes candidates the worker has not reached (or never saw).
+    """
+
+    def __init__(self, model, text_fn, store=None, batch_size=INGEST_BATCH_SIZE):
+        self.model = model
+        self.encoder = BucketedEncoder(model)
+        self.text_fn = text_fn
+        self.store = store or EmbeddingStore()
+        self.batch_size = batch_size
+        self.encode_lock = threading.Lock()
+        self.queue = queue.Queue()
+        self.worker = threading.Thread(target=self._run, daemon=True)
+        self.worker.start()
+
+    def submit(self, candidates):
+        """Queue normalized candidate dicts whose profile text has no embedding yet (the
+        others just point their id at the stored row); until the worker reaches them,
+        lookups by id fall back to rows_for so a changed profile is never matched with a
+        stale vector"""
+        rows = self.store.lookup([text_key(self.text_fn(cand)) for cand in candidates])
+        known = np.flatnonzero(rows >= 0)
+        self.store.remember_ids([candidates[j].get("id") for j in known], rows[known])
+        new = [candidates[j] for j in np.flatnonzero(rows < 0)]
+        self.store.forget_ids([cand.get("id") for cand in new])
+        for cand in new:
+            self.queue.put(cand)
+
+    def pending(self):
+        return self.queue.qsize()
+
+    def _run(self):
+        while True:
+            batch = [self.queue.get()]
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(self.queue.get_nowait())
+                except queue.Empty:
+                    break
+            try:
+                self.rows_for(batch, ids=[c.get("id") for c in batch])
+            except Exception as e:
+                print(f"[ERROR] Ingest batch failed: {e}")
+            finally:
+                for _ in batch:
+                    self.queue.task_done()
+
+    def encode(self, texts, keys=None):
+        with self.encode_lock:
+            return self.encoder.encode(texts, keys)
+
+    def rows_for(self, records, ids=None):
+        """Store rows holding the embeddings of these records, encoding only new texts"""
+        return self.embed(records, ids)[0]
+
+    def embed(self, records, ids=None):
+        """(store rows, text hashes) for these records, encoding only new texts"""
+        texts = [self.text_fn(r) for r in records]
+        keys = [text_key(t) for t in texts]
+        rows = self.store.lookup(keys)
+        missing = np.flatnonzero(rows < 0)
+        if missing.size:
+            vectors = self.encode([texts[j] for j in missing], [keys[j] for j in missing])
+            rows[missing] = self.store.add([keys[j] for j in missing], vectors)
+        if ids is not None:
+            self.store.remember_ids(ids, rows)
+        return rows, keys
+
+    def vectors(self, records):
+        """Embeddings of records for a one-off scan: cached texts are reused, new ones are
+        encoded but not added to the store, so scanning a huge file does not grow it"""
+        texts = [self.text_fn(r) for r in records]
+        keys = [text_key(t) for t in texts]
+        rows = self.store.lookup(keys)
+        missing = np.flatnonzero(rows < 0)
+        if missing.size == len(texts):
+            return self.encode(texts, keys)
+        vectors = self.store.take(np.maximum(rows, 0))
+        if missing.size:
+            vectors[missing] = self.encode([texts[j] for j in missing], [keys[j] for j in missing])
+        return vectors
+
+    def rows_for_ids(self, ids):
+        """Rows of already ingested candidates by id (-1 where not ingested yet)"""
+        with self.store.lock:
+            return np.fromiter((self.store.id_rows.get(i, -1) for i in ids), dtype=np.int64, count=len(ids))
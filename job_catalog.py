@@ -0,0 +1,104 @@
+# job_catalog.py
+import json
+import os
+import re
+import threading
+from datetime import datetime
+
+JOB_FILE = re.compile(r"^job_(\d+)_(\d{14})\.json$")
+
+
+class JobCatalog:
+    """
+    Job descriptions indexed in memory and persisted one file per job
+    (job_{id}_{timestamp}.json). The directory is scanned once at startup; after
+    that ids come from a counter, lookups/listing/latest are dict operations and
+    every description is embedded as soon as the job is stored.
+    """
+
+    def __init__(self, jobs_dir, encode=None):
+        self.jobs_dir = jobs_dir
+        self.encode = encode
+        self.lock = threading.Lock()
+        self.jobs = {}         # id -> internship dict
+        self.files = {}        # id -> file name
+        self.embeddings = {}   # id -> (description, normalized vector)
+        self.latest_id = None
+        self.next_id = 1
+        self._load()
+
+    def _load(self):
+        stamped = {}
+        for filename in os.listdir(self.jobs_dir):
+            match = JOB_FILE.match(filename)
+            if match is None:
+                continue
+            path = os.path.join(self.jobs_dir, filename)
+            # Name stamp has 1 s resolution; mtime orders submissions within a second
+            job_id, stamp = int(match.group(1)), (match.group(2), os.stat(path).st_mtime_ns)
+            if job_id in stamped and stamped[job_id][0] >= stamp:
+                continue
+            try:
+                with open(path, "r", encoding="utf-8") as f:
+                    job = json.load(f)
+            except Exception as e:
+                print(f"[ERROR] Failed to read {filename}: {e}")
+                continue
+            stamped[job_id] = (stamp, filename, job)
+        # Submission order, so the last one is the current job
+        for job_id, (stamp, filename, job) in sorted(stamped.items(), key=lambda item: (item[1][0], item[0])):
+            self.jobs[job_id] = job
+            self.files[job_id] = filename
+            self.latest_id = job_id
+        self.next_id = max(self.jobs, default=0) + 1
+        self._embed(list(self.jobs))
+
+    def _embed(self, job_ids):
+        if self.encode is None or not job_ids:
+            return
+        descriptions = [self.jobs[job_id]["description"] for job_id in job_ids]
+        vectors = self.encode(descriptions)
+        for job_id, description, vector in zip(job_ids, descriptions, vectors):
+            self.embeddings[job_id] = (description, vector)
+
+    def __len__(self):
+        return len(self.jobs)
+
+    def save(self, fields, job_id=None):
+        """Store a new job (job_id=None) or replace an existing one; returns the internship dict"""
+        with self.lock:
+            if job_id is None:
+                job_id = self.next_id
+            self.next_id = max(self.next_id, job_id + 1)
+            internship = {"id": job_id, **fields}
+
+            filename = f"job_{job_id}_{datetime.now().strftime('%Y%m%d%H%M%S')}.json"
+            tmp = os.path.join(self.jobs_dir, f".{filename}.tmp")
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(internship, f, indent=2)
+            os.replace(tmp, os.path.join(self.jobs_dir, filename))
+            old = self.files.get(job_id)
+            if old is not None and old != filename:
+                os.remove(os.path.join(self.jobs_dir, old))
+
+            self.jobs.pop(job_id, None)  # re-insert so listing stays in submission order
+            self.jobs[job_id] = internship
+            self.files[job_id] = filename
+            self.latest_id = job_id
+            if self.embeddings.get(job_id, (None,))[0] != internship["description"]:
+                self._embed([job_id])
+            return internship
+
+    def get(self, job_id):
+        return self.jobs.get(job_id)
+
+    def latest(self):
+        return self.jobs.get(self.latest_id)
+
+    def list(self):
+        return list(self.jobs.values())
+
+    def embedding(self, job_id, description):
+        """Cached embedding of a stored job's description, or None if not (or no longer) cached"""
+        cached = self.embeddings.get(job_id)
+        return cached[1] if cached is not None and cached[0] == description else None
@@ -0,0 +1,185 @@
+# job_queue.py
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+import traceback
+from contextlib import contextmanager
+
+JOB_WORKERS = 1
+JOB_POLL_INTERVAL = 1.0
+JOB_RETENTION_S = 24 * 3600
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id TEXT PRIMARY KEY,
+    kind TEXT NOT NULL,
+    status TEXT NOT NULL,
+    payload BLOB,
+    params TEXT,
+    progress REAL DEFAULT 0,
+    message TEXT,
+    partial TEXT,
+    result TEXT,
+    error TEXT,
+    created_at REAL,
+    updated_at REAL
+)
+"""
+
+
+def job_id(kind, payload, params):
+    """Same kind + bytes + params -> same id, so client retries attach to the existing job"""
+    digest = hashlib.sha1(kind.encode("utf-8"))
+    digest.update(payload or b"")
+    digest.update(json.dumps(params or {}, sort_keys=True).encode("utf-8"))
+    return digest.hexdigest()[:24]
+
+
+class JobContext:
+    """Handed to handlers so they can publish progress and partial results"""
+
+    def __init__(self, queue, job_id):
+        self.queue = queue
+        self.job_id = job_id
+
+    def report(self, progress, message=None, partial=None):
+        self.queue._update(
+            self.job_id,
+            progress=max(0.0, min(1.0, float(progress))),
+            message=message,
+            partial=None if partial is None else json.dumps(partial),
+        )
+
+
+class JobQueue:
+    """
+    Persistent job queue on SQLite. submit() stores the payload and returns an id
+    immediately; worker threads run the registered handler for the job's kind.
+    Jobs interrupted by a restart are picked up again on start().
+    """
+
+    def __init__(self, path, workers=JOB_WORKERS):
+        self.path = path
+        self.workers = workers
+        self.handlers = {}
+        self.wakeup = threading.Event()
+        self.threads = []
+        with self._connect() as db:
+            db.execute("PRAGMA journal_mode=WAL")
+            db.execute(SCHEMA)
+
+    @contextmanager
+    def _connect(self):
+        db = sqlite3.connect(self.path, timeout=30)
+        db.row_factory = sqlite3.Row
+        try:
+            with db:
+                yield db
+        finally:
+            db.close()
+
+    def handler(self, kind):
+        """Decorator registering fn(ctx, payload, params) -> JSON-able result"""
+        def register(fn):
+            self.handlers[kind] = fn
+            return fn
+        return register
+
+    def start(self):
+        now = time.time()
+        with self._connect() as db:
+            db.execute("UPDATE jobs SET status='queued' WHERE status='running'")
+            db.execute(
+                "DELETE FROM jobs WHERE status IN ('done', 'failed') AND updated_at < ?",
+                (now - JOB_RETENTION_S,)
+            )
+        for _ in range(self.workers):
+            thread = threading.Thread(target=self._run, daemon=True)
+            thread.start()
+            self.threads.append(thread)
+
+    def submit(self, kind, payload, params=None):
+        """Queue a job (or return the existing one for identical input); returns its id"""
+        if kind not in self.handlers:
+            raise ValueError(f"Unknown job kind: {kind}")
+        jid = job_id(kind, payload, params)
+        now = time.time()
+        with self._connect() as db:
+            row = db.execute("SELECT status FROM jobs WHERE id=?", (jid,)).fetchone()
+            if row is None:
+                db.execute(
+                    "INSERT INTO jobs (id, kind, status, payload, params, created_at, updated_at) "
+                    "VALUES (?, ?, 'queued', ?, ?, ?, ?)",
+                    (jid, kind, payload, json.dumps(params or {}), now, now)
+                )
+            elif row["status"] == "failed":
+                db.execute(
+                    "UPDATE jobs SET status='queued', progress=0, error=NULL, updated_at=? WHERE id=?",
+                    (now, jid)
+                )
+        self.wakeup.set()
+        return jid
+
+    def get(self, jid):
+        """Status dict for the API, or None"""
+        with self._connect() as db:
+            row = db.execute(
+                "SELECT id, kind, status, progress, message, partial, result, error, created_at, updated_at "
+                "FROM jobs WHERE id=?", (jid,)
+            ).fetchone()
+        if row is None:
+            return None
+        job = dict(row)
+        for key in ("partial", "result"):
+            job[key] = json.loads(job[key]) if job[key] else None
+        if job["status"] == "queued":
+            job["position"] = self._position(job["created_at"])
+        return job
+
+    def _position(self, created_at):
+        with self._connect() as db:
+            return db.execute(
+                "SELECT COUNT(*) FROM jobs WHERE status='queued' AND created_at < ?", (created_at,)
+            ).fetchone()[0]
+
+    def _claim(self):
+        """Atomically move the oldest queued job to running"""
+        with self._connect() as db:
+            db.isolation_level = None
+            db.execute("BEGIN IMMEDIATE")
+            row = db.execute(
+                "SELECT id, kind, payload, params FROM jobs WHERE status='queued' "
+                "ORDER BY created_at LIMIT 1"
+            ).fetchone()
+            if row is not None:
+                db.execute(
+                    "UPDATE jobs SET status='running', updated_at=? WHERE id=?", (time.time(), row["id"])
+                )
+            db.execute("COMMIT")
+        return row
+
+    def _update(self, jid, **values):
+        values = {k: v for k, v in values.items() if v is not None}
+        values["updated_at"] = time.time()
+        columns = ", ".join(f"{k}=?" for k in values)
+        with self._connect() as db:
+            db.execute(f"UPDATE jobs SET {columns} WHERE id=?", (*values.values(), jid))
+
+    def _run(self):
+        while True:
+            row = self._claim()
+            if row is None:
+                self.wakeup.wait(JOB_POLL_INTERVAL)
+                self.wakeup.clear()
+                continue
+            jid = row["id"]
+            try:
+                result = self.handlers[row["kind"]](
+                    JobContext(self, jid), row["payload"], json.loads(row["params"] or "{}")
+                )
+                self._update(jid, status="done", progress=1.0, message="Completed", result=json.dumps(result, default=str))
+            except Exception as e:
+                traceback.print_exc()
+                self._update(jid, status="failed", error=str(e))
@@ -0,0 +1,120 @@
+# job_ranking.py
+import hashlib
+import json
+from collections import OrderedDict
+import numpy as np
+from candidate_table import CandidateTable, base_components, with_semantic
+from encoder import BucketedEncoder
+
+MAX_CACHED_POOLS = 4
+
+# Internship fields each cached stage depends on
+SEMANTIC_FIELDS = ("description",)
+COMPONENT_FIELDS = ("required_skills", "location", "targeted_social", "rules")
+
+
+def pool_key(candidates):
+    """Content hash of a candidate list, so re-uploads of the same file hit the cache"""
+    return hashlib.sha1(json.dumps(candidates, sort_keys=True, default=str).encode("utf-8")).hexdigest()
+
+
+class CandidatePool:
+    __slots__ = ("table", "rows", "embeddings")
+
+    def __init__(self, table, rows, embeddings):
+        self.table = table
+        self.rows = rows
+        self.embeddings = embeddings
+
+
+class JobRanking:
+    """Everything computed for one job against one pool"""
+
+    __slots__ = ("job", "pool_key", "intern_embedding", "sem_sim", "base", "partial", "components")
+
+    def __init__(self, job, pool_key):
+        self.job = dict(job)
+        self.pool_key = pool_key
+        self.intern_embedding = None
+        self.sem_sim = None
+        self.base = None
+        self.partial = None
+        self.components = None
+
+
+class RankingCache:
+    """
+    Caches candidate embeddings per pool and score components per job, so editing a
+    job only recomputes what the edited fields affect:
+      - capacity / quotas          -> nothing here, selection reruns on cached scores
+      - required_skills / location -> cheap components only
+      - description                -> re-embed the job text (candidate vectors are reused)
+    """
+
+    def __init__(self, model, text_fn, weights, rural_bonus, social_bonus, past_penalty):
+        self.model = model
+        self.encoder = BucketedEncoder(model)
+        self.text_fn = text_fn
+        self.score_args = (weights, rural_bonus, social_bonus, past_penalty)
+        self.pools = OrderedDict()
+        self.jobs = {}
+
+    def pool(self, candidates):
+        key = pool_key(candidates)
+        pool = self.pools.get(key)
+        if pool is not None:
+            self.pools.move_to_end(key)
+            return key, pool
+
+        table = CandidateTable(candidates)
+        rows = np.flatnonzero(~table.has_experience)
+        texts = [self.text_fn(table.records[i]) for i in rows]
+        embeddings = self.encoder.encode(texts)
+        table.emb_row[rows] = np.arange(rows.size)
+        pool = self.pools[key] = CandidatePool(table, rows, embeddings)
+        if len(self.pools) > MAX_CACHED_POOLS:
+            self.pools.popitem(last=False)
+        return key, pool
+
+    def rank(self, job, candidates, job_embedding=None):
+        """Returns (pool, components) with components covering pool.rows.
+        job_embedding: precomputed normalized description embedding, if the caller has one"""
+        key, pool = self.pool(candidates)
+        cached = self.jobs.get(job['id'])
+        if cached is None or cached.pool_key != key:
+            cached = JobRanking({}, key)
+
+        entry = JobRanking(job, key)
+        if pool.rows.size == 0:
+            return pool, None
+
+        if _same(cached.job, job, SEMANTIC_FIELDS):
+            entry.intern_embedding, entry.sem_sim = cached.intern_embedding, cached.sem_sim
+        else:
+            if job_embedding is not None:
+                entry.intern_embedding = job_embedding
+            else:
+                entry.intern_embedding = self.model.encode(
+                    job['description'], convert_to_numpy=True, normalize_embeddings=True
+                )
+            entry.sem_sim = pool.embeddings @ entry.intern_embedding
+
+        if _same(cached.job, job, COMPONENT_FIELDS):
+            entry.base, entry.partial = cached.base, cached.partial
+        else:
+            entry.base, entry.partial = base_components(pool.table, pool.rows, job, *self.score_args)
+
+        if entry.sem_sim is cached.sem_sim and entry.base is cached.base:
+            entry.components = cached.components
+        else:
+            entry.components = with_semantic(entry.base, entry.partial, entry.sem_sim, self.score_args[0])
+
+        self.jobs[job['id']] = entry
+        return pool, entry.components
+
+    def forget(self, job_id):
+        self.jobs.pop(job_id, None)
+
+
+def _same(old, new, fields):
+    return bool(old) and all(old.get(name) == new.get(name) for name in fields)
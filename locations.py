@@ -0,0 +1,238 @@
+# locations.py
+import re
+import threading
+from functools import lru_cache
+import numpy as np
+
+# ==============================
+# Gazetteer
+# ==============================
+# (name, state, lat, lon, aliases). Offline and deliberately small: the cities
+# internships and applicants actually name, plus every state / union territory.
+CITIES = [
+    ("Mumbai", "Maharashtra", 19.076, 72.878, ["bombay"]),
+    ("Navi Mumbai", "Maharashtra", 19.033, 73.030, []),
+    ("Thane", "Maharashtra", 19.218, 72.978, []),
+    ("Pune", "Maharashtra", 18.520, 73.857, ["poona"]),
+    ("Nagpur", "Maharashtra", 21.146, 79.088, []),
+    ("Nashik", "Maharashtra", 19.998, 73.790, ["nasik"]),
+    ("Aurangabad", "Maharashtra", 19.876, 75.343, ["chhatrapati sambhajinagar"]),
+    ("Delhi", "Delhi", 28.614, 77.209, ["new delhi", "delhi ncr", "ncr"]),
+    ("Noida", "Uttar Pradesh", 28.535, 77.391, ["greater noida"]),
+    ("Ghaziabad", "Uttar Pradesh", 28.669, 77.454, []),
+    ("Gurugram", "Haryana", 28.459, 77.027, ["gurgaon"]),
+    ("Faridabad", "Haryana", 28.408, 77.317, []),
+    ("Bengaluru", "Karnataka", 12.972, 77.595, ["bangalore", "blr"]),
+    ("Mysuru", "Karnataka", 12.296, 76.639, ["mysore"]),
+    ("Mangaluru", "Karnataka", 12.914, 74.856, ["mangalore"]),
+    ("Hubballi", "Karnataka", 15.365, 75.124, ["hubli", "hubli dharwad"]),
+    ("Hyderabad", "Telangana", 17.385, 78.487, ["secunderabad", "cyberabad"]),
+    ("Warangal", "Telangana", 17.969, 79.594, []),
+    ("Chennai", "Tamil Nadu", 13.083, 80.271, ["madras"]),
+    ("Coimbatore", "Tamil Nadu", 11.017, 76.956, ["kovai"]),
+    ("Madurai", "Tamil Nadu", 9.925, 78.120, []),
+    ("Tiruchirappalli", "Tamil Nadu", 10.790, 78.705, ["trichy", "tiruchi"]),
+    ("Kolkata", "West Bengal", 22.573, 88.364, ["calcutta"]),
+    ("Ahmedabad", "Gujarat", 23.023, 72.571, ["amdavad"]),
+    ("Gandhinagar", "Gujarat", 23.216, 72.637, []),
+    ("Surat", "Gujarat", 21.170, 72.831, []),
+    ("Vadodara", "Gujarat", 22.307, 73.181, ["baroda"]),
+    ("Rajkot", "Gujarat", 22.303, 70.802, []),
+    ("Jaipur", "Rajasthan", 26.912, 75.787, []),
+    ("Jodhpur", "Rajasthan", 26.238, 73.024, []),
+    ("Udaipur", "Rajasthan", 24.585, 73.712, []),
+    ("Kota", "Rajasthan", 25.214, 75.865, []),
+    ("Lucknow", "Uttar Pradesh", 26.847, 80.947, []),
+    ("Kanpur", "Uttar Pradesh", 26.449, 80.332, []),
+    ("Agra", "Uttar Pradesh", 27.177, 78.008, []),
+    ("Varanasi", "Uttar Pradesh", 25.318, 82.974, ["banaras", "benares"]),
+    ("Prayagraj", "Uttar Pradesh", 25.435, 81.846, ["allahabad"]),
+    ("Chandigarh", "Chandigarh", 30.733, 76.779, ["tricity"]),
+    ("Mohali", "Punjab", 30.704, 76.717, ["sas nagar"]),
+    ("Ludhiana", "Punjab", 30.901, 75.857, []),
+    ("Amritsar", "Punjab", 31.634, 74.872, []),
+    ("Indore", "Madhya Pradesh", 22.720, 75.858, []),
+    ("Bhopal", "Madhya Pradesh", 23.260, 77.413, []),
+    ("Patna", "Bihar", 25.594, 85.138, []),
+    ("Bhubaneswar", "Odisha", 20.296, 85.825, ["bhubaneshwar"]),
+    ("Visakhapatnam", "Andhra Pradesh", 17.687, 83.218, ["vizag", "vishakhapatnam"]),
+    ("Vijayawada", "Andhra Pradesh", 16.506, 80.648, []),
+    ("Amaravati", "Andhra Pradesh", 16.573, 80.358, []),
+    ("Kochi", "Kerala", 9.931, 76.267, ["cochin", "ernakulam"]),
+    ("Thiruvananthapuram", "Kerala", 8.524, 76.937, ["trivandrum"]),
+    ("Kozhikode", "Kerala", 11.259, 75.780, ["calicut"]),
+    ("Guwahati", "Assam", 26.144, 91.736, []),
+    ("Shillong", "Meghalaya", 25.578, 91.893, []),
+    ("Ranchi", "Jharkhand", 23.344, 85.310, []),
+    ("Jamshedpur", "Jharkhand", 22.805, 86.203, []),
+    ("Raipur", "Chhattisgarh", 21.251, 81.630, []),
+    ("Dehradun", "Uttarakhand", 30.317, 78.032, []),
+    ("Shimla", "Himachal Pradesh", 31.105, 77.173, []),
+    ("Srinagar", "Jammu and Kashmir", 34.084, 74.797, []),
+    ("Jammu", "Jammu and Kashmir", 32.727, 74.857, []),
+    ("Leh", "Ladakh", 34.152, 77.577, []),
+    ("Panaji", "Goa", 15.491, 73.828, ["panjim"]),
+    ("Puducherry", "Puducherry", 11.941, 79.808, ["pondicherry", "pondy"]),
+    ("Imphal", "Manipur", 24.817, 93.937, []),
+    ("Agartala", "Tripura", 23.831, 91.287, []),
+    ("Gangtok", "Sikkim", 27.339, 88.607, []),
+    ("Itanagar", "Arunachal Pradesh", 27.084, 93.605, []),
+    ("Aizawl", "Mizoram", 23.727, 92.718, []),
+    ("Kohima", "Nagaland", 25.674, 94.110, []),
+    ("Port Blair", "Andaman and Nicobar Islands", 11.623, 92.726, ["sri vijaya puram"]),
+]
+
+# States and union territories that are not also a city above (approximate centroids)
+STATES = [
+    ("Andhra Pradesh", 15.91, 79.74, ["ap"]),
+    ("Arunachal Pradesh", 28.22, 94.73, []),
+    ("Assam", 26.20, 92.94, []),
+    ("Bihar", 25.10, 85.31, []),
+    ("Chhattisgarh", 21.28, 81.87, []),
+    ("Goa", 15.30, 74.12, []),
+    ("Gujarat", 22.26, 71.19, []),
+    ("Haryana", 29.06, 76.09, []),
+    ("Himachal Pradesh", 31.10, 77.17, ["hp"]),
+    ("Jharkhand", 23.61, 85.28, []),
+    ("Karnataka", 15.32, 75.71, []),
+    ("Kerala", 10.85, 76.27, []),
+    ("Madhya Pradesh", 22.97, 78.66, ["mp"]),
+    ("Maharashtra", 19.75, 75.71, []),
+    ("Manipur", 24.66, 93.91, []),
+    ("Meghalaya", 25.47, 91.37, []),
+    ("Mizoram", 23.16, 92.94, []),
+    ("Nagaland", 26.16, 94.56, []),
+    ("Odisha", 20.95, 85.10, ["orissa"]),
+    ("Punjab", 31.15, 75.34, []),
+    ("Rajasthan", 27.02, 74.22, []),
+    ("Sikkim", 27.53, 88.51, []),
+    ("Tamil Nadu", 11.13, 78.66, ["tn"]),
+    ("Telangana", 18.11, 79.02, []),
+    ("Tripura", 23.94, 91.99, []),
+    ("Uttar Pradesh", 26.85, 80.95, ["up"]),
+    ("Uttarakhand", 30.07, 79.02, ["uttaranchal"]),
+    ("West Bengal", 22.99, 87.86, ["wb"]),
+    ("Jammu and Kashmir", 33.78, 76.58, ["j and k", "jk"]),
+    ("Ladakh", 34.15, 77.58, []),
+    ("Andaman and Nicobar Islands", 11.74, 92.66, ["andaman", "andaman and nicobar"]),
+    ("Lakshadweep", 10.57, 72.64, []),
+    ("Dadra and Nagar Haveli and Daman and Diu", 20.40, 72.83, ["daman", "diu", "silvassa"]),
+]
+
+REMOTE = "remote"
+REMOTE_ALIASES = ["work from home", "wfh", "online", "virtual", "anywhere"]
+
+# ==============================
+# Distance decay
+# ==============================
+DECAY_KM = 100.0      # affinity exp(-distance / DECAY_KM) between two places
+MIN_AFFINITY = 0.05   # below this two places count as unrelated
+SAME_STATE = 0.25     # floor for two places in the same state
+IN_STATE = 0.5        # a city and the state it lies in
+REMOTE_AFFINITY = 1.0  # every candidate, wherever they are, for a remote internship
+
+
+def _key(text):
+    text = text.lower().replace("&", " and ")
+    return " ".join(re.sub(r"[^a-z0-9 ]+", " ", text).split())
+
+
+def _build():
+    keys, states, coords, aliases = [REMOTE], [None], [(np.nan, np.nan)], {REMOTE: REMOTE}
+    aliases.update((_key(alias), REMOTE) for alias in REMOTE_ALIASES)
+    places = list(CITIES)
+    places += [(name, name, lat, lon, names) for name, lat, lon, names in STATES]
+    for name, state, lat, lon, names in places:
+        keys.append(_key(name))
+        states.append(_key(state))
+        coords.append((lat, lon))
+        aliases.update((_key(alias), _key(name)) for alias in [name, *names])
+
+    lat, lon = np.radians(np.array(coords, dtype=np.float64)).T
+    # Haversine distance between every pair of places, in km
+    a = (np.sin((lat[:, None] - lat[None, :]) / 2) ** 2
+         + np.cos(lat[:, None]) * np.cos(lat[None, :]) * np.sin((lon[:, None] - lon[None, :]) / 2) ** 2)
+    km = 2 * 6371.0 * np.arcsin(np.sqrt(a))
+    with np.errstate(invalid="ignore"):
+        affinity = np.exp(-km / DECAY_KM)
+    affinity[~(affinity >= MIN_AFFINITY)] = 0.0  # also clears Remote's NaN rows
+
+    state = np.array([s or "" for s in states])
+    is_state = np.zeros(len(keys), dtype=bool)
+    is_state[1 + len(CITIES):] = True
+    same_state = (state[:, None] == state[None, :]) & (state[:, None] != "")
+    # States only relate to the places inside them, not to neighbouring states by distance
+    affinity[is_state[:, None] | is_state[None, :]] = 0.0
+    affinity[same_state] = np.maximum(affinity[same_state], SAME_STATE)
+    affinity[same_state & (is_state[:, None] ^ is_state[None, :])] = IN_STATE
+    np.fill_diagonal(affinity, 1.0)
+    return keys, aliases, affinity.astype(np.float32)
+
+
+PLACES, ALIASES, AFFINITY = _build()
+
+# Interned location ids: gazetteer places first, so ids below len(PLACES) index
+# AFFINITY; anything else gets the next free id and only matches itself
+LOCATION_IDS = {key: i for i, key in enumerate(PLACES)}
+UNKNOWN_LOCATION = -1  # query location that no candidate has
+_INTERN_LOCK = threading.Lock()
+
+
+@lru_cache(maxsize=4096)
+def resolve_location(location):
+    """Canonical key of a free-text location: the gazetteer place it names (directly,
+    by alias, or in one of its comma-separated parts) or else its normalized text"""
+    key = _key(location)
+    if key in ALIASES:
+        return ALIASES[key]
+    for part in location.split(","):
+        part = _key(part)
+        if part in ALIASES:
+            return ALIASES[part]
+    return key
+
+
+def intern_location(location):
+    """Id of a candidate's location, adding it if new (pool data only: query-side
+    locations are only looked up, see location_id)"""
+    key = resolve_location(location)
+    location_id = LOCATION_IDS.get(key)
+    if location_id is None:
+        with _INTERN_LOCK:
+            location_id = LOCATION_IDS.setdefault(key, len(LOCATION_IDS))
+    return location_id
+
+
+def location_id(location):
+    """Id of an internship/quota/rule location without interning it: its gazetteer
+    place, an already known location, or UNKNOWN_LOCATION (matches no candidate)"""
+    return LOCATION_IDS.get(resolve_location(location), UNKNOWN_LOCATION)
+
+
+def location_affinity(codes, target):
+    """Affinity of every location id in codes to the target id: a lookup in the
+    precomputed AFFINITY row (exact matches only outside the gazetteer). A remote
+    target is location-neutral: every candidate gets the same REMOTE_AFFINITY."""
+    if target == LOCATION_IDS[REMOTE]:
+        return np.full(len(codes), REMOTE_AFFINITY, dtype=np.float32)
+    codes = np.asarray(codes)
+    out = np.zeros(codes.size, dtype=np.float32)
+    if 0 <= target < len(PLACES):
+        placed = codes < len(PLACES)
+        out[placed] = AFFINITY[target][codes[placed]]
+    out[codes == target] = 1.0
+    return out
+
+
+def location_score(candidate_loc, req_loc):
+    """Scalar form of location_affinity for one pair of free-text locations (neither
+    is interned)"""
+    candidate, target = resolve_location(candidate_loc), resolve_location(req_loc)
+    if target == REMOTE:
+        return REMOTE_AFFINITY
+    if candidate == target:
+        return 1.0
+    i, j = LOCATION_IDS.get(candidate, UNKNOWN_LOCATION), LOCATION_IDS.get(target, UNKNOWN_LOCATION)
+    if 0 <= i < len(PLACES) and 0 <= j < len(PLACES):
+        return float(AFFINITY[j, i])
+    return 0.0
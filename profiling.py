@@ -0,0 +1,113 @@
+# profiling.py
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from datetime import datetime
+
+# ==============================
+# Config
+# ==============================
+PROFILE_DIR = "profiles"
+PROFILE_INTERVAL = 0.005       # seconds between samples when profiling is requested
+AUTO_PROFILE_INTERVAL = 0.02   # coarser sampling for the always-on slow request check
+SLOW_REQUEST_MS = 2000         # requests slower than this get their stacks stored
+
+
+# ==============================
+# Sampling profiler
+# ==============================
+class StackSampler:
+    """Samples the Python stack of one thread from a background timer thread"""
+
+    def __init__(self, thread_id=None, interval=PROFILE_INTERVAL, root_code=None):
+        self.thread_id = thread_id if thread_id is not None else threading.get_ident()
+        self.interval = interval
+        self.root_code = root_code  # frames above this code object (server/event loop) are dropped
+        self.stacks = Counter()
+        self.samples = 0
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is None:
+                continue
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                if code is self.root_code:
+                    break
+                stack.append(f"{os.path.basename(code.co_filename)}:{code.co_name}")
+                frame = frame.f_back
+            stack.reverse()
+            if not stack or stack[0].startswith("profiling.py:"):
+                continue  # sampler start/stop overhead, not the profiled call
+            self.stacks[";".join(stack)] += 1
+            self.samples += 1
+
+    def folded(self):
+        """Stacks in collapsed "root;child;leaf count" form (flamegraph.pl / speedscope)"""
+        return [f"{stack} {count}" for stack, count in self.stacks.most_common()]
+
+
+def profile_call(label, fn, *args, force=False, slow_ms=None, **kwargs):
+    """
+    Run fn under the sampler. Returns (result, report).
+
+    report is None unless profiling was forced or the call took longer than slow_ms
+    (default SLOW_REQUEST_MS); slow calls also get their folded stacks written to PROFILE_DIR.
+    """
+    if slow_ms is None:
+        slow_ms = SLOW_REQUEST_MS
+    sampler = StackSampler(
+        interval=PROFILE_INTERVAL if force else AUTO_PROFILE_INTERVAL,
+        root_code=profile_call.__code__
+    )
+    start = time.perf_counter()
+    with sampler:
+        result = fn(*args, **kwargs)
+    elapsed_ms = (time.perf_counter() - start) * 1000
+
+    slow = elapsed_ms > slow_ms
+    if not force and not slow:
+        return result, None
+
+    report = {
+        "label": label,
+        "elapsed_ms": round(elapsed_ms, 2),
+        "samples": sampler.samples,
+        "interval_ms": sampler.interval * 1000,
+        "folded": sampler.folded(),
+    }
+    if slow:
+        report["stored_at"] = save_profile(report)
+        print(f"[WARN] Slow {label} request ({elapsed_ms:.0f} ms), profile saved to {report['stored_at']}")
+    return result, report
+
+
+def save_profile(report):
+    os.makedirs(PROFILE_DIR, exist_ok=True)
+    filename = f"{report['label']}_{datetime.now().strftime('%Y%m%d%H%M%S%f')}.folded"
+    path = os.path.join(PROFILE_DIR, filename)
+    with open(path, "w", encoding="utf-8") as f:
+        f.write("\n".join(report["folded"]) + "\n")
+    return path
@@ -341,18 +341,43 @@ if __name__ == "__main__":
 
 
 '''
-from fastapi import FastAPI, File, UploadFile, Form
-from fastapi.responses import JSONResponse
+from fastapi import FastAPI, File, UploadFile, Form, Header, Request
+from fastapi.responses import JSONResponse, Response, StreamingResponse
 from pydantic import BaseModel
-from typing import List, Dict
-from sentence_transformers import SentenceTransformer, util
+from typing import List, Dict, Optional, Any
+from sentence_transformers import SentenceTransformer
+import numpy as np
+import orjson
+import msgspec
 import uvicorn
 import os
 import json
 from pyngrok import ngrok
 import shutil
 import subprocess
+import threading
+import time
+import hashlib
 import re
+from collections import ChainMap
+from profiling import profile_call
+from candidate_table import CandidateTable, field, base_components, with_semantic, prune_by_bound, breakdown_at
+from skill_vocab import VOCAB, match_counts
+from skill_index import SkillIndex
+from allocation import score_matrix, allocate
+from ingest import IngestPipeline, normalize_candidate
+from snapshot import Snapshot, save_snapshot, MANIFEST
+from quotas import QuotaError, quota_constraints, select_with_quotas, quota_report
+from job_queue import JobQueue
+import structs
+from compression import CompressionMiddleware, decompress, is_upload, open_stream, read_upload, stored_name, write_upload
+from stream_match import JsonScanner, StreamingMatcher, group_masks, scan_match_file, STREAM_MEMORY_MB
+from shards import ShardPool, SHARD_WORKERS
+from anytime import anytime_scores
+from whatif import ComponentCache, ScoreComponents, weight_sets
+from weights import WEIGHTS, SCORE_ARGS, weight_set
+from scoring_rules import RuleError, plan_for, rule_filter
+from cascade import CASCADE_DEPTH, cascade_shortlist, rerankers
 
 # ==============================
 # Configurable weights
@@ -362,20 +387,15 @@ RESUME_PIPELINE = "resumeocr.py"
 PARSER_PIPELINE = "parseonlyocr.py"  # <-- new parser script
 os.makedirs(UPLOAD_DIR, exist_ok=True)
 
-WEIGHTS = {
-    "skill": 0.5,
-    "semantic": 0.3,
-    "location": 0.1,
-    "experience": 0.1
-}
-RURAL_BONUS = 0.1
-SOCIAL_BONUS = {"SC": 0.08, "ST": 0.1, "OBC": 0.05, "General": 0.0}
-PAST_PARTICIPATION_PENALTY = 0.15
+# WEIGHTS and the bonuses live in weights.py, shared with the other backends;
+# /what_if tries alternatives per request
 
 # ==============================
 # FastAPI app
 # ==============================
 app = FastAPI()
+# gzip/zstd request bodies (Content-Encoding) and Accept-Encoding negotiated responses
+app.add_middleware(CompressionMiddleware)
 
 # ==============================
 # Model load (once)
@@ -394,114 +414,559 @@ os.makedirs(UPLOAD_DIR, exist_ok=True)
 # Helper functions
 # ==============================
 def profile_to_text(profile):
+    experience = field(profile, 'experience', [])
     parts = [
-        f"Name: {profile['name']}",
-        f"Education: {profile.get('education','')}",
-        f"Skills: {', '.join(profile['skills'])}",
-        f"Experience: {', '.join(profile.get('experience',[])) if isinstance(profile.get('experience'), list) else profile.get('experience','')}",
-        f"Objective: {profile.get('objective','')}"
+        f"Name: {field(profile, 'name')}",
+        f"Education: {field(profile, 'education', '')}",
+        f"Skills: {', '.join(field(profile, 'skills'))}",
+        f"Experience: {', '.join(experience) if isinstance(experience, list) else experience}",
+        f"Objective: {field(profile, 'objective', '')}"
     ]
-    project_texts = [f"{p['title']}: {p['description']}" for p in profile.get('projects',[])]
+    project_texts = [f"{p['title']}: {p['description']}" for p in field(profile, 'projects', [])]
     if project_texts:
         parts.append("Projects: " + " | ".join(project_texts))
-    if profile.get('certifications'):
-        parts.append("Certifications: " + ", ".join(profile['certifications']))
+    if field(profile, 'certifications'):
+        parts.append("Certifications: " + ", ".join(field(profile, 'certifications')))
     return ". ".join(parts)
 
-def skills_match_fraction(candidate_skills, req_skills):
-    return sum(1 for s in req_skills if s in candidate_skills) / len(req_skills)
+# Candidate texts/embeddings are computed once per distinct profile, in the background
+# for uploads (see register_applicants) and on demand for anything not seen before
+INGEST = IngestPipeline(model, profile_to_text)
+# Second-stage models for cascade ranking (?rerank=mpnet|cross), loaded on first use
+RERANKERS = rerankers(profile_to_text)
+
+def candidate_vectors(table, rows, pooled=False):
+    """Embeddings for table rows. Pooled rows are looked up by id in the ingest store;
+    candidates sent with the request reuse stored vectors of known profile texts but
+    are not added to the store, so request traffic does not grow it"""
+    if not pooled:
+        return INGEST.vectors([table.records[i] for i in rows])
+    store_rows = INGEST.rows_for_ids(table.ids[rows])
+    missing = np.flatnonzero(store_rows < 0)
+    if missing.size:
+        store_rows[missing] = INGEST.rows_for(
+            [table.records[i] for i in rows[missing]], ids=table.ids[rows[missing]].tolist()
+        )
+    table.emb_row[rows] = store_rows
+    return INGEST.store.take(store_rows)
 
-def location_score(candidate_loc, req_loc):
-    return 1.0 if candidate_loc.strip().lower() == req_loc.strip().lower() else 0.0
+class Selection:
+    """
+    Outcome of ranking one internship: the selected rows in final order plus what is
+    needed to materialize them. Response dicts are only built on iteration, so a
+    streaming response can send each candidate as soon as it is materialized.
+    """
+    __slots__ = ("message", "table", "rows", "components", "order", "constraints", "coverage")
+
+    def __init__(self, message, table=None, rows=None, components=None, order=None, constraints=(), coverage=None):
+        self.message = message
+        self.table = table
+        self.rows = rows
+        self.components = components
+        self.order = order
+        self.constraints = constraints
+        self.coverage = coverage  # set when ranked under a latency budget
+
+    def __len__(self):
+        return 0 if self.order is None else len(self.order)
+
+    def candidates(self, compact=False):
+        scores = self.components["final_score"] if self.components is not None else None
+        for j in (self.order if self.order is not None else ()):
+            if compact:
+                yield self.table.materialize(self.rows[j], None, scores[j])
+            else:
+                yield self.table.materialize(self.rows[j], breakdown_at(self.components, j))
+
+    def quotas(self):
+        return quota_report(self.constraints, self.order) if self.constraints else None
+
+    def to_dict(self, compact=False):
+        result = {"selected": list(self.candidates(compact)), "message": self.message}
+        if self.constraints:
+            result["quotas"] = self.quotas()
+        if self.coverage is not None:
+            result["coverage"] = self.coverage
+        return result
+
+def select_candidates(internship, candidates, min_skills=0, pooled=False, budget_ms=None,
+                      rerank=None, rerank_depth=CASCADE_DEPTH):
+    return rank_candidates(
+        internship, candidates, min_skills, pooled, budget_ms=budget_ms, rerank=rerank, rerank_depth=rerank_depth
+    ).to_dict()
+
+def rank_candidates(internship, candidates, min_skills=0, pooled=False, table=None, budget_ms=None,
+                    rerank=None, rerank_depth=CASCADE_DEPTH):
+    """Score and select; pass table instead of candidates when the columns already exist.
+    With budget_ms the best selection found when the budget runs out is returned, with
+    its coverage (exact=True when no unscored candidate could have changed it).
+    With rerank (a RERANKERS key) the top rerank_depth (at least capacity) by the MiniLM score
+    are re-scored with that model and selected from; the MiniLM value is kept in the
+    breakdown as recall_sim."""
+    deadline = None if budget_ms is None else time.monotonic() + budget_ms / 1000
+    if table is None:
+        table = CandidateTable(candidates)
+    # Only select freshers (no experience entries, or only "fresher"; parsed at ingest)
+    rows = np.flatnonzero(table.fresher)
+    if rows.size == 0:
+        return Selection("No fresher candidates found.")
+
+    # Optional prefilter: at least min_skills of the required skills
+    if min_skills > 0:
+        required = VOCAB.bitset(internship['required_skills'])
+        rows = rows[match_counts(table.skill_bits[rows], required) >= min_skills]
+        if rows.size == 0:
+            return Selection(f"No candidates with at least {min_skills} required skills.")
+
+    # Hard filters from the internship's own rules (exclude / require)
+    rows = rule_filter(table, rows, internship)
+    if rows.size == 0:
+        return Selection("No candidates pass the internship's rules.")
+
+    components, partial = base_components(
+        table, rows, internship, *SCORE_ARGS
+    )
+    capacity = internship['capacity']
+    constraints = quota_constraints(table, rows, internship)
+    # Only encode candidates that can still be selected on the cheap components:
+    # the overall top `capacity` or the top `seats` of one of the quota groups
+    keep = prune_by_bound(partial, WEIGHTS['semantic'], capacity)
+    for mask, seats, _ in constraints:
+        members = np.flatnonzero(mask)
+        keep[members] |= prune_by_bound(partial[members], WEIGHTS['semantic'], seats)
+    eligible = rows.size
+    keep = np.flatnonzero(keep)
+    rows, partial = rows[keep], partial[keep]
+    components = {name: values[keep] for name, values in components.items()}
+    constraints = [(mask[keep], seats, label) for mask, seats, label in constraints]
+
+    intern_embedding = model.encode(internship['description'], convert_to_numpy=True, normalize_embeddings=True)
+    population = coverage = None
+    if deadline is None:
+        sem_sim = candidate_vectors(table, rows, pooled) @ intern_embedding
+    else:
+        # Anytime: embed the most promising candidates first (cached embeddings are
+        # free) and select among those scored when the deadline hits
+        free = INGEST.rows_for_ids(table.ids[rows]) >= 0 if pooled else None
+        sem_sim, undecided = anytime_scores(
+            partial, group_masks(constraints, rows.size), internship, WEIGHTS['semantic'],
+            lambda batch: candidate_vectors(table, rows[batch], pooled) @ intern_embedding,
+            deadline, free
+        )
+        scored = np.flatnonzero(~np.isnan(sem_sim))
+        coverage = {
+            "exact": undecided == 0,
+            "completeness": round(1.0 - undecided / eligible, 4),
+            "eligible": int(eligible),
+            "scored": int(scored.size),
+            "budget_ms": budget_ms,
+        }
+        population = [mask.sum() for mask, _, _ in constraints]
+        rows, partial, sem_sim = rows[scored], partial[scored], sem_sim[scored]
+        components = {name: values[scored] for name, values in components.items()}
+        constraints = [(mask[scored], seats, label) for mask, seats, label in constraints]
+    if rerank is not None:
+        # Cascade: cached MiniLM similarity shortlists, the slower model only sees the shortlist
+        if population is None:
+            population = [mask.sum() for mask, _, _ in constraints]
+        first = np.maximum(0.0, partial + WEIGHTS['semantic'] * sem_sim)
+        short = cascade_shortlist(first, constraints, capacity, rerank_depth)
+        rows, partial = rows[short], partial[short]
+        components = {name: values[short] for name, values in components.items()}
+        components["recall_sim"] = sem_sim[short]
+        constraints = [(mask[short], seats, label) for mask, seats, label in constraints]
+        sem_sim = RERANKERS[rerank].similarity(internship['description'], [table.records[i] for i in rows])
+    components = with_semantic(components, partial, sem_sim, WEIGHTS)
+
+    order = select_with_quotas(components["final_score"], constraints, capacity, population)
+    return Selection("Selection completed.", table, rows, components, order, constraints, coverage)
+
+def rank_candidate_stream(internship, items, min_skills=0, memory_mb=STREAM_MEMORY_MB):
+    """rank_candidates over (candidate, JSON size) pairs read incrementally, with memory
+    bounded by memory_mb instead of the pool size. Returns (Selection, scan stats)"""
+    intern_embedding = model.encode(internship['description'], convert_to_numpy=True, normalize_embeddings=True)
+    matcher = StreamingMatcher(
+        internship, intern_embedding, INGEST.vectors, SCORE_ARGS, min_skills
+    ).run(items, memory_mb)
+    return partial_selection(matcher.result(), matcher.stats, min_skills), matcher.stats
+
+def partial_selection(result, counts, min_skills):
+    """Selection from a merged shortlist result (None when nothing was eligible)"""
+    if result is not None:
+        return Selection("Selection completed.", *result)
+    if counts["freshers"] == 0:
+        return Selection("No fresher candidates found.")
+    if min_skills > 0:
+        return Selection(f"No candidates with at least {min_skills} required skills.")
+    return Selection("No candidates pass the internship's rules.")
 
-def experience_score(candidate_exp):
-    # For freshers, experience_score = 1
-    if not candidate_exp:
-        return 1.0
-    exp_text = " ".join(candidate_exp) if isinstance(candidate_exp, list) else candidate_exp
-    exp_text = exp_text.lower()
-    if "fresher" in exp_text or "months" in exp_text:
-        return 1.0
-    if "1 year" in exp_text:
-        return 0.9
-    if "2 year" in exp_text:
-        return 0.6
-    if "research" in exp_text:
-        return 0.8
-    return 0.5
+# ==============================
+# Responses
+# ==============================
+class FastJSONResponse(Response):
+    """JSON via orjson (numpy scalars/arrays included). Endpoints return it directly,
+    which skips FastAPI's jsonable_encoder walk over every nested dict"""
+    media_type = "application/json"
+
+    def render(self, content):
+        return orjson.dumps(content, option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS)
+
+STREAM_FORMATS = {"ndjson": "application/x-ndjson", "sse": "text/event-stream"}
+
+def selection_events(selection, meta=None, compact=False):
+    """(event, data) pairs: meta, one candidate per selected row (best first), done"""
+    if selection.coverage is not None:
+        meta = {**(meta or {}), "coverage": selection.coverage}
+    yield "meta", {"total": len(selection), "message": selection.message, **(meta or {})}
+    for rank, candidate in enumerate(selection.candidates(compact), 1):
+        yield "candidate", {"rank": rank, "candidate": candidate}
+    yield "done", {"quotas": selection.quotas()}
+
+def stream_selection(selection, fmt, meta=None, compact=False):
+    """NDJSON lines ({"type": event, ...}) or Server-Sent Events for a Selection"""
+    def encode():
+        for event, data in selection_events(selection, meta, compact):
+            if fmt == "sse":
+                yield b"event: " + event.encode() + b"\ndata: " + orjson.dumps(data) + b"\n\n"
+            else:
+                yield orjson.dumps({"type": event, **data}) + b"\n"
+    return StreamingResponse(encode(), media_type=STREAM_FORMATS[fmt])
+
+def selection_response(selection, stream=None, profile_report=None, compact=False, meta=None):
+    """Stream, or serialize the whole selection in one FastJSONResponse.
+    compact=True drops the per-candidate breakdown (and never computes it)."""
+    if profile_report is not None:
+        meta = {**(meta or {}), "profile": profile_report}
+    if stream:
+        return stream_selection(selection, stream, meta, compact)
+    return FastJSONResponse(content={**selection.to_dict(compact), **(meta or {})})
+
+def bad_rerank(rerank, depth):
+    if rerank is not None and rerank not in RERANKERS:
+        return JSONResponse(content={"error": f"rerank must be one of {sorted(RERANKERS)}"}, status_code=400)
+    if depth < 1:
+        return JSONResponse(content={"error": "rerank_depth must be at least 1"}, status_code=400)
+    return None
+
+def bad_stream_format(stream):
+    if stream is not None and stream not in STREAM_FORMATS:
+        return JSONResponse(
+            content={"error": f"stream must be one of {sorted(STREAM_FORMATS)}"}, status_code=400
+        )
+    return None
+
+def allocate_batch(internships, candidates, compact=False):
+    """Place one candidate pool across many internships in a single pass:
+    one encode of the pool, one K x N score matrix, one global assignment"""
+    table = CandidateTable(candidates)
+    rows = np.flatnonzero(table.fresher)
+    if rows.size == 0 or not internships:
+        return {"allocations": [], "unassigned": len(rows), "message": "No fresher candidates found."}
+
+    embeddings = candidate_vectors(table, rows)
+    job_embeddings = model.encode(
+        [internship['description'] for internship in internships],
+        convert_to_numpy=True, normalize_embeddings=True
+    )
 
-def compute_hybrid_score(cand, intern_emb, cand_emb, internship):
-    skill_frac = skills_match_fraction(cand['skills'], internship['required_skills'])
-    sem_sim = util.pytorch_cos_sim(cand_emb, intern_emb).item()
-    loc = location_score(cand['location'], internship['location'])
-    exp = experience_score(cand.get('experience', []))
-    base = (
-        WEIGHTS['skill'] * skill_frac
-        + WEIGHTS['semantic'] * sem_sim
-        + WEIGHTS['location'] * loc
-        + WEIGHTS['experience'] * exp
+    scores, components = score_matrix(
+        table, rows, embeddings, internships, job_embeddings,
+        SCORE_ARGS
     )
-    adj = 0.0
-    if cand.get('rural', False):
-        adj += RURAL_BONUS
-    adj += SOCIAL_BONUS.get(cand.get('social', 'General'), 0.0)
-    if cand.get('past_participation', False):
-        adj -= PAST_PARTICIPATION_PENALTY
-    if internship.get('targeted_social') and cand.get('social') == internship['targeted_social']:
-        adj += 0.06
-    final_score = max(0.0, base + adj)
-    breakdown = {
-        "skill_frac": skill_frac,
-        "semantic_sim": sem_sim,
-        "location": loc,
-        "experience": exp,
-        "social_bonus": SOCIAL_BONUS.get(cand.get('social', 'General'), 0.0),
-        "rural_bonus": RURAL_BONUS if cand.get('rural', False) else 0.0,
-        "past_penalty": PAST_PARTICIPATION_PENALTY if cand.get('past_participation', False) else 0.0,
-        "final_score": final_score
+    constraints = [quota_constraints(table, rows, internship) for internship in internships]
+    owner, picks = allocate(scores, internships, constraints)
+
+    allocations = []
+    for k, internship in enumerate(internships):
+        ordered = sorted(picks[k], key=lambda j: -scores[k, j])
+        allocations.append({
+            "internship_id": internship['id'],
+            "title": internship['title'],
+            "selected": [
+                table.materialize(rows[j], None, scores[k, j]) if compact
+                else table.materialize(rows[j], breakdown_at(components[k], j))
+                for j in ordered
+            ]
+        })
+    unassigned = int((owner < 0).sum())
+    return {
+        "allocations": allocations,
+        "unassigned": unassigned,
+        "message": f"Allocated {rows.size - unassigned} candidates across {len(internships)} internships."
     }
-    return final_score, breakdown
 
-def select_candidates(internship, candidates):
-    # Only select freshers (experience field empty or None)
-    filtered_candidates = [c for c in candidates if not c.get("experience")]
-    if not filtered_candidates:
-        return {"selected": [], "message": "No fresher candidates found."}
+# ==============================
+# Applicant pool
+# ==============================
+# Uploads since the last snapshot live in the first map; a loaded snapshot is
+# appended behind it (records decoded from the memory-mapped file on access)
+APPLICANTS = ChainMap({})
+SKILL_INDEX = SkillIndex()
+# Held while the pool or the skill index is changed or read (job workers register
+# candidates off the event loop thread)
+POOL_LOCK = threading.Lock()
+SNAPSHOT_DIR = os.path.join(UPLOAD_DIR, "pool_snapshot")
+SNAPSHOT = None
+# Worker processes over the snapshot, started by the first sharded match (or POST /shards)
+SHARDS = None
+
+def register_applicants(candidates):
+    """Add uploaded candidates to the pool and the skill index, and queue them for
+    background text rendering + embedding"""
+    candidates = [normalize_candidate(c) for c in candidates]
+    with POOL_LOCK:
+        for cand in candidates:
+            APPLICANTS[cand['id']] = cand
+            SKILL_INDEX.add(cand['id'], cand['skills'])
+    INGEST.submit(candidates)
+
+async def read_upload_file(file):
+    """Bytes of an uploaded file, decompressed if the client sent it gzip/zstd compressed"""
+    return decompress(await file.read())
+
+def store_upload(content):
+    """Keep an upload in UPLOAD_DIR, compressed and named by content hash, so re-uploads
+    of the same file are stored once. Returns (path, whether it was new)"""
+    path = os.path.join(UPLOAD_DIR, stored_name(content))
+    return path, write_upload(path, content)
+
+def upload_sources():
+    """{filename: [size, mtime]} of the uploads in UPLOAD_DIR; a snapshot covers a file
+    only while both are unchanged"""
+    sources = {}
+    for filename in os.listdir(UPLOAD_DIR):
+        if is_upload(filename):
+            stat = os.stat(os.path.join(UPLOAD_DIR, filename))
+            sources[filename] = [stat.st_size, stat.st_mtime]
+    return sources
+
+def save_applicant_snapshot():
+    """Write the whole pool (fields, skill bitsets, embeddings) as a binary snapshot"""
+    sources = upload_sources()
+    with POOL_LOCK:
+        ids = list(APPLICANTS)
+        records = [APPLICANTS[i] for i in ids]
+    table = CandidateTable(records)
+    store_rows, keys = INGEST.embed(records, ids)
+    save_snapshot(SNAPSHOT_DIR, table, INGEST.store.take(store_rows), keys, VOCAB, sources)
+    return len(ids)
+
+def load_applicant_snapshot():
+    """Memory-map the saved pool instead of re-parsing and re-embedding it"""
+    snapshot = Snapshot(SNAPSHOT_DIR)
+    if not snapshot.restore_vocab(VOCAB):
+        raise ValueError("skill vocabulary differs from the snapshot's")
+    INGEST.store.load(snapshot.embeddings, snapshot.columns["text_keys"], snapshot.ids)
+    SKILL_INDEX.add_bitsets(snapshot.ids, snapshot.columns["skill_bits"])
+    APPLICANTS.maps.append(snapshot.records)
+    return snapshot
+
+def load_applicant_pool():
+    global SNAPSHOT
+    covered = {}
+    if os.path.exists(os.path.join(SNAPSHOT_DIR, MANIFEST)):
+        try:
+            SNAPSHOT = load_applicant_snapshot()
+            covered = SNAPSHOT.sources
+            print(f"[INFO] Loaded snapshot with {len(SNAPSHOT)} applicants.")
+        except Exception as e:
+            print(f"[ERROR] Ignoring snapshot: {e}")
+    current = upload_sources()
+    # Oldest upload first, so the latest version of a candidate id wins
+    for filename in sorted(current, key=lambda name: current[name][1]):
+        if covered.get(filename) != current[filename]:
+            try:
+                data = json.loads(read_upload(os.path.join(UPLOAD_DIR, filename)))
+                register_applicants(data.get("candidates", []) if isinstance(data, dict) else data)
+            except Exception as e:
+                print(f"[ERROR] Failed to index {filename}: {e}")
+    print(f"[INFO] Indexed {len(SKILL_INDEX)} applicants.")
 
-    candidate_texts = [profile_to_text(c) for c in filtered_candidates]
-    intern_text = internship['description']
-    candidate_embeddings = model.encode(candidate_texts, convert_to_tensor=True)
-    intern_embedding = model.encode(intern_text, convert_to_tensor=True)
+def snapshot_sources():
+    """Uploads covered by the saved snapshot (None if missing or from an older format)"""
+    try:
+        return Snapshot(SNAPSHOT_DIR).sources
+    except (OSError, ValueError):
+        return None
+
+def sharded_pool(workers=None):
+    """The ShardPool, (re)started over an up-to-date snapshot of the pool: uploads
+    changed since its snapshot are saved into a new one and the shards reloaded"""
+    global SHARDS
+    if SHARDS is not None and workers is not None and workers != len(SHARDS):
+        SHARDS.close()
+        SHARDS = None
+    current = upload_sources()
+    if SHARDS is not None and SHARDS.sources == current:
+        return SHARDS
+    if snapshot_sources() != current:
+        save_applicant_snapshot()
+    if SHARDS is None:
+        SHARDS = ShardPool(SNAPSHOT_DIR, workers or SHARD_WORKERS)
+    else:
+        SHARDS.reload(SNAPSHOT_DIR)
+    return SHARDS
+
+def rank_applicants_sharded(internship, min_skills=0):
+    """Pool ranking scattered over the shard workers. Returns (Selection, counts)"""
+    plan_for(internship)  # invalid rules fail here rather than in every worker
+    intern_embedding = model.encode(internship['description'], convert_to_numpy=True, normalize_embeddings=True)
+    result, counts = sharded_pool().match(
+        internship, intern_embedding, SCORE_ARGS, min_skills
+    )
+    return partial_selection(result, counts, min_skills), counts
 
-    scores_breakdowns = [
-        compute_hybrid_score(c, intern_embedding, ce, internship)
-        for c, ce in zip(filtered_candidates, candidate_embeddings)
-    ]
+# ==============================
+# What-if weights
+# ==============================
+# Weight-independent score features per (internship, pool): a what-if request only
+# redoes one matrix product, whatever the number of weight sets
+WHAT_IF = ComponentCache()
+
+def what_if_components(internship, candidates=None, min_skills=0):
+    """ScoreComponents of an internship against candidates (None = the applicant pool)"""
+    job = {k: internship.get(k) for k in ("description", "required_skills", "location", "targeted_social", "capacity", "quotas", "rules")}
+    pool = msgspec.json.encode(candidates) if candidates is not None else orjson.dumps(upload_sources())
+    key = hashlib.sha1(orjson.dumps(job, option=orjson.OPT_SORT_KEYS) + pool + str(min_skills).encode()).hexdigest()
+
+    def build():
+        if candidates is None:
+            table = eligible_pool(internship['required_skills'], min_skills)
+            rows = np.flatnonzero(table.fresher)
+        else:
+            table = CandidateTable(candidates)
+            rows = np.flatnonzero(table.fresher)
+            if min_skills > 0:
+                required = VOCAB.bitset(internship['required_skills'])
+                rows = rows[match_counts(table.skill_bits[rows], required) >= min_skills]
+        rows = rule_filter(table, rows, internship)
+        sem_sim = np.zeros(rows.size, dtype=np.float32)
+        if rows.size:
+            intern_embedding = model.encode(internship['description'], convert_to_numpy=True, normalize_embeddings=True)
+            sem_sim = candidate_vectors(table, rows, pooled=candidates is None) @ intern_embedding
+        return ScoreComponents(table, rows, internship, sem_sim, quota_constraints(table, rows, internship))
+
+    return WHAT_IF.get(key, build)
+
+def what_if(internship, candidates=None, weights=(), grid=None, min_skills=0):
+    """Selections under each alternative weight set next to the current weights"""
+    sets = [weight_set()] + weight_sets(weights, grid)
+    components = what_if_components(internship, candidates, min_skills)
+    if components.rows.size == 0:
+        return {"baseline": None, "results": [], "message": "No eligible candidates found."}
+    scores = components.rescore(sets)
+    table, rows, constraints = components.table, components.rows, components.constraints
+
+    def ranking(w):
+        order = select_with_quotas(scores[:, w], constraints, internship['capacity'])
+        result = {
+            "weights": sets[w],
+            "selected": [
+                {"id": int(table.ids[rows[j]]), "name": field(table.records[rows[j]], "name"), "final_score": float(scores[j, w])}
+                for j in order
+            ]
+        }
+        if constraints:
+            result["quotas"] = quota_report(constraints, order)
+        return result
+
+    baseline = ranking(0)
+    current = {c["id"] for c in baseline["selected"]}
+    results = []
+    for w in range(1, len(sets)):
+        result = ranking(w)
+        result["changed"] = sum(c["id"] not in current for c in result["selected"])
+        results.append(result)
+    return {"baseline": baseline, "results": results, "message": f"Ranked {rows.size} candidates under {len(results)} weight sets."}
+
+def pool_table(candidate_ids):
+    """CandidateTable for pool ids (sorted). Built straight from the snapshot columns
+    when none of them were uploaded again since the snapshot was taken"""
+    ids = sorted(candidate_ids)
+    if SNAPSHOT is not None and not any(i in APPLICANTS.maps[0] for i in ids):
+        rows = SNAPSHOT.rows_of(ids)
+        if (rows >= 0).all():
+            return SNAPSHOT.table(rows)
+    return CandidateTable([APPLICANTS[i] for i in ids])
+
+def eligible_pool(required_skills, min_skills):
+    """pool_table of the applicants with at least min_skills of the required skills"""
+    with POOL_LOCK:
+        return pool_table(SKILL_INDEX.candidates_with(required_skills, min_skills))
+
+load_applicant_pool()
 
-    # Sort candidates by final score
-    candidates_sorted = sorted(
-        zip(filtered_candidates, scores_breakdowns),
-        key=lambda x: x[1][0],  # final_score
-        reverse=True
+# ==============================
+# Resume pipeline
+# ==============================
+PROGRESS_LINE = re.compile(r"\[PROGRESS\] page (\d+)/(\d+)")
+
+def run_resume_pipeline(pdf_bytes, on_progress=None):
+    """Run the OCR + recommendation script on a PDF; on_progress(done, total) is
+    called as pages finish"""
+    proc = subprocess.Popen(
+        ["python", RESUME_PIPELINE],
+        stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.PIPE
     )
+    stdout = []
+    reader = threading.Thread(target=lambda: stdout.append(proc.stdout.read()), daemon=True)
+    reader.start()
+    proc.stdin.write(pdf_bytes)
+    proc.stdin.close()
+    errors = []
+    for line in proc.stderr:
+        line = line.decode("utf-8", errors="ignore")
+        progress = PROGRESS_LINE.search(line)
+        if progress is None:
+            errors.append(line)
+        elif on_progress is not None:
+            on_progress(int(progress.group(1)), int(progress.group(2)))
+    proc.wait()
+    reader.join()
+    stdout_text = stdout[0].decode("utf-8", errors="ignore") if stdout else ""
+    matches = re.findall(r"\[\{.*\}\]", stdout_text, re.DOTALL)
+    return json.loads(matches[-1]) if matches else {"output": stdout_text, "errors": "".join(errors)}
 
-    capacity = internship['capacity']
-    selected = []
+# ==============================
+# Background jobs
+# ==============================
+# Large uploads and multi-page PDFs go through the job queue instead of holding the
+# request open: submit returns a job id, GET /jobs/{id} reports progress and the result
+JOBS = JobQueue(os.path.join(UPLOAD_DIR, "jobs.db"))
+JOB_CHUNK = 2000  # candidates per progress report of a match job
+
+@JOBS.handler("match_from_file")
+def match_from_file_job(ctx, payload, params):
+    data = json.loads(payload.decode("utf-8"))
+    internship = data.get("internship")
+    candidates = data.get("candidates")
+    if internship is None or candidates is None:
+        raise ValueError("Invalid JSON. Must contain 'internship' and 'candidates' keys.")
+    store_upload(payload)
+    # Chunk by chunk: register, score into a streaming shortlist, then report progress
+    # with the selection so far (same final selection as ranking everything at once)
+    intern_embedding = model.encode(internship['description'], convert_to_numpy=True, normalize_embeddings=True)
+    matcher = StreamingMatcher(internship, intern_embedding, INGEST.vectors, SCORE_ARGS)
+    total = len(candidates)
+    for start in range(0, total, JOB_CHUNK):
+        chunk = candidates[start:start + JOB_CHUNK]
+        register_applicants(chunk)
+        matcher.add(chunk)
+        done = start + len(chunk)
+        ctx.report(
+            0.95 * done / total, f"Scored {done}/{total} candidates",
+            partial={"scored": done, "total": total, **partial_selection(matcher.result(), matcher.stats, 0).to_dict(compact=True)}
+        )
+    return partial_selection(matcher.result(), matcher.stats, 0).to_dict()
 
-    for cand, (score, breakdown) in candidates_sorted[:capacity]:
-        selected.append({
-            "id": cand["id"],
-            "name": cand["name"],
-            "skills": cand["skills"],
-            "location": cand.get("location", "Unknown"),
-            "experience": cand.get("experience", []),
-            "social": cand.get("social", "General"),
-            "rural": cand.get("rural", False),
-            "past_participation": cand.get("past_participation", False),
-            "final_score": breakdown["final_score"],
-            "breakdown": breakdown
-        })
-    return {"selected": selected, "message": "Selection completed."}
+@JOBS.handler("recommendations")
+def recommendations_job(ctx, payload, params):
+    def on_progress(done, total):
+        ctx.report(0.9 * done / total, f"OCR page {done}/{total}", partial={"pages_done": done, "pages_total": total})
+    ctx.report(0.0, "Running OCR")
+    return {"recommendations": run_resume_pipeline(payload, on_progress)}
+
+JOBS.start()
 
 # ==============================
 # API Models
@@ -513,80 +978,270 @@ class Internship(BaseModel):
     required_skills: List[str]
     location: str
     capacity: int
-    quotas: Dict[str, int]
+    quotas: Dict[str, Any] = {}  # absolute ("SC_min": 2) or fractional ("rural": 0.3, "social": {"SC": 0.2})
     targeted_social: str | None = None
-
-class Candidate(BaseModel):
-    id: int
-    name: str
-    skills: List[str]
-    location: str
-    rural: bool = False
-    social: str = "General"
-    experience: List[str] = []
-    past_participation: bool = False
-    has_experience: bool = False
-
-class MatchRequest(BaseModel):
-    internship: Internship
-    candidates: List[Candidate]
+    rules: List[Dict[str, Any]] = []  # bonuses, penalties and hard filters, see scoring_rules
 
 class InternshipRequest(BaseModel):
     internship: Internship
 
+@app.exception_handler(RuleError)
+async def rule_error(request, exc):
+    return JSONResponse(content={"detail": f"Invalid scoring rules: {exc}"}, status_code=422)
+
+@app.exception_handler(QuotaError)
+async def quota_error(request, exc):
+    return JSONResponse(content={"detail": f"Invalid quotas: {exc}"}, status_code=422)
+
+def decode_body(body, struct_type):
+    """(struct, None) or (None, 422 response) for a JSON request body"""
+    try:
+        return structs.decode(body, struct_type), None
+    except msgspec.MsgspecError as e:
+        return None, JSONResponse(content={"detail": str(e)}, status_code=422)
+
 # ==============================
 # API Endpoints
 # ==============================
 @app.get("/health")
 async def health():
-    return {"status": "ok", "message": "Server is running"}
+    # encoding: texts/chunks/batches encoded so far and padded vs real tokens
+    return {"status": "ok", "message": "Server is running", "encoding": dict(INGEST.encoder.stats)}
 
 @app.post("/match_internship")
-async def match_internship(request: MatchRequest):
-    result = select_candidates(request.internship.dict(), [c.dict() for c in request.candidates])
-    return result
+async def match_internship(
+    request: Request,
+    min_skills: int = 0,
+    profile: bool = False,
+    stream: Optional[str] = None,
+    compact: bool = False,
+    budget_ms: Optional[int] = None,
+    rerank: Optional[str] = None,
+    rerank_depth: int = CASCADE_DEPTH,
+    x_profile: Optional[str] = Header(None)
+):
+    # ?profile=1 or "X-Profile: 1" returns the sampled stacks with the response;
+    # slow requests are always sampled and stored under PROFILE_DIR.
+    # ?stream=ndjson|sse sends each selected candidate as soon as it is ready;
+    # ?compact=1 leaves out the per-candidate score breakdown;
+    # ?budget_ms=200 returns the best selection found within 200 ms plus its coverage;
+    # ?rerank=mpnet|cross re-scores the top rerank_depth candidates with that model
+    error = bad_stream_format(stream) or bad_rerank(rerank, rerank_depth)
+    if error:
+        return error
+    # Body is a structs.MatchRequest, decoded straight from bytes; the candidate
+    # structs go to the scoring code as-is
+    body, error = decode_body(await request.body(), structs.MatchRequest)
+    if error:
+        return error
+    force_profile = profile or x_profile == "1"
+    selection, report = profile_call(
+        "match_internship",
+        rank_candidates,
+        structs.as_dict(body.internship),
+        body.candidates,
+        min_skills=min_skills,
+        budget_ms=budget_ms,
+        rerank=rerank,
+        rerank_depth=rerank_depth,
+        force=force_profile
+    )
+    return selection_response(selection, stream, report if force_profile else None, compact)
 
 @app.post("/match_from_file")
-async def match_from_file(file: UploadFile = File(...)):
-    file_path = os.path.join(UPLOAD_DIR, file.filename)
-    content = await file.read()
-    with open(file_path, "wb") as f:
-        f.write(content)
+async def match_from_file(
+    file: UploadFile = File(...),
+    profile: bool = False,
+    stream: Optional[str] = None,
+    compact: bool = False,
+    x_profile: Optional[str] = Header(None)
+):
+    error = bad_stream_format(stream)
+    if error:
+        return error
+    content = await read_upload_file(file)
+    store_upload(content)
 
     data = json.loads(content.decode("utf-8"))
     internship = data.get("internship")
     candidates = data.get("candidates")
     if internship is None or candidates is None:
         return {"error": "Invalid JSON. Must contain 'internship' and 'candidates' keys."}
+    register_applicants(candidates)
 
-    result = select_candidates(internship, candidates)
-    return result
+    force_profile = profile or x_profile == "1"
+    selection, report = profile_call(
+        "match_from_file", rank_candidates, internship, candidates, force=force_profile
+    )
+    return selection_response(selection, stream, report if force_profile else None, compact)
+
+@app.post("/match_large_file")
+async def match_large_file(
+    file: Optional[UploadFile] = File(None),
+    stored: Optional[str] = Form(None),
+    internship: Optional[str] = Form(None),
+    min_skills: int = 0,
+    memory_mb: int = STREAM_MEMORY_MB,
+    stream: Optional[str] = None,
+    compact: bool = False
+):
+    """
+    Match a candidate file of any size with flat memory: the file (an upload, or a
+    stored upload in UPLOAD_DIR named by `stored`) is read and scored in chunks that
+    fit in memory_mb, keeping only a running shortlist per quota group. The internship
+    comes from the `internship` form field or must precede "candidates" in the file.
+    Candidates are not added to the applicant pool.
+    """
+    error = bad_stream_format(stream)
+    if error:
+        return error
+    if stored is not None:
+        if os.path.basename(stored) != stored or not is_upload(stored):
+            return JSONResponse(content={"error": f"Unknown stored upload {stored}"}, status_code=404)
+        path = os.path.join(UPLOAD_DIR, stored)
+        if not os.path.exists(path):
+            return JSONResponse(content={"error": f"Unknown stored upload {stored}"}, status_code=404)
+        source = open(path, "rb")
+    elif file is not None:
+        source = file.file
+    else:
+        return JSONResponse(content={"error": "Send a file or the name of a stored upload."}, status_code=400)
+
+    try:
+        events = scan_match_file(JsonScanner(open_stream(source)))
+        if internship is None:
+            kind, internship, _ = next(events, (None, None, None))
+            if kind != "internship":
+                raise ValueError("'internship' must come before 'candidates' in the file, or be sent as a form field.")
+        else:
+            internship = json.loads(internship)
+        internship = structs.as_dict(structs.convert(internship, structs.Internship))
+        items = ((candidate, size) for kind, candidate, size in events if kind == "candidate")
+        selection, stats = rank_candidate_stream(internship, items, min_skills, max(1, memory_mb))
+    except (ValueError, msgspec.MsgspecError) as e:
+        return JSONResponse(content={"error": str(e)}, status_code=400)
+    finally:
+        if stored is not None:
+            source.close()
+    return selection_response(selection, stream, compact=compact, meta={"scan": stats})
+
+@app.post("/upload_resumes")
+async def upload_resumes(file: UploadFile = File(...)):
+    """Upload a JSON file of resumes, store it on disk and add it to the applicant pool"""
+    content = await read_upload_file(file)
+    file_path, is_new = store_upload(content)
+    data = json.loads(content.decode("utf-8"))
+    candidates = data.get("candidates", []) if isinstance(data, dict) else data
+    register_applicants(candidates)
+    return {
+        "message": f"File saved at {file_path}" if is_new else f"Same file already stored at {file_path}",
+        "indexed": len(candidates),
+        "total_applicants": len(APPLICANTS),
+        "ingest_pending": INGEST.pending()
+    }
+
+@app.post("/match_applicants")
+async def match_applicants(
+    internship_request: InternshipRequest,
+    min_skills: int = 1,
+    stream: Optional[str] = None,
+    compact: bool = False,
+    sharded: bool = False,
+    rerank: Optional[str] = None,
+    rerank_depth: int = CASCADE_DEPTH
+):
+    """Match an internship against the uploaded applicant pool, scoring only
+    applicants that have at least min_skills of the required skills.
+    ?sharded=1 scatters the scoring over the shard worker processes;
+    ?rerank=mpnet|cross re-scores the top rerank_depth with the slower model."""
+    error = bad_stream_format(stream) or bad_rerank(rerank, rerank_depth)
+    if error:
+        return error
+    internship = internship_request.internship.dict()
+    if sharded:
+        if rerank is not None:
+            return JSONResponse(content={"error": "rerank is not supported with sharded=1"}, status_code=400)
+        selection, counts = rank_applicants_sharded(internship, min_skills)
+        return selection_response(selection, stream, compact=compact, meta={"shards": counts})
+    table = eligible_pool(internship['required_skills'], min_skills)
+    selection = rank_candidates(
+        internship, None, pooled=True, table=table, rerank=rerank, rerank_depth=rerank_depth
+    )
+    return selection_response(selection, stream, compact=compact)
+
+@app.post("/snapshot")
+async def snapshot_pool():
+    """Persist the applicant pool so restarts memory-map it instead of re-parsing uploads"""
+    count = save_applicant_snapshot()
+    return {"message": f"Snapshot saved at {SNAPSHOT_DIR}", "applicants": count}
+
+@app.post("/shards")
+async def start_shards(workers: int = SHARD_WORKERS):
+    """Start (or resize) the shard workers over a fresh snapshot of the pool"""
+    shards = sharded_pool(max(1, workers))
+    return {"workers": len(shards), "applicants": len(shards.snapshot)}
+
+@app.post("/what_if")
+async def what_if_endpoint(request: Request, min_skills: int = 0):
+    """Rankings under alternative weights (a list and/or a grid of them), all from
+    cached score components. Body is a structs.WhatIfRequest; without candidates the
+    applicant pool is used."""
+    body, error = decode_body(await request.body(), structs.WhatIfRequest)
+    if error:
+        return error
+    try:
+        result = what_if(structs.as_dict(body.internship), body.candidates, body.weights, body.grid, min_skills)
+    except (ValueError, TypeError) as e:
+        return JSONResponse(content={"error": str(e)}, status_code=400)
+    return FastJSONResponse(content=result)
+
+@app.post("/allocate_batch")
+async def allocate_batch_endpoint(request: Request, compact: bool = False):
+    # Body is a structs.BatchRequest
+    body, error = decode_body(await request.body(), structs.BatchRequest)
+    if error:
+        return error
+    return FastJSONResponse(
+        content=allocate_batch([structs.as_dict(i) for i in body.internships], body.candidates, compact)
+    )
+
+@app.post("/jobs/match_from_file")
+async def submit_match_from_file(file: UploadFile = File(...)):
+    """Queue /match_from_file as a background job; poll /jobs/{job_id} for the result"""
+    content = await read_upload_file(file)
+    job_id = JOBS.submit("match_from_file", content)
+    return {"job_id": job_id, "status_url": f"/jobs/{job_id}"}
+
+@app.post("/jobs/recommendations")
+async def submit_recommendations(file: UploadFile = File(...)):
+    """Queue /recommendations as a background job; poll /jobs/{job_id} for the result"""
+    pdf_bytes = await file.read()
+    job_id = JOBS.submit("recommendations", pdf_bytes)
+    return {"job_id": job_id, "status_url": f"/jobs/{job_id}"}
+
+@app.get("/jobs/{job_id}")
+async def job_status(job_id: str):
+    job = JOBS.get(job_id)
+    if job is None:
+        return JSONResponse(content={"error": f"Unknown job {job_id}"}, status_code=404)
+    return job
 
 @app.post("/match_custom_internship")
 async def match_custom_internship(
     internship_request: InternshipRequest,
     resume_file: UploadFile = File(...)
 ):
-    contents = await resume_file.read()
+    contents = await read_upload_file(resume_file)
     resumes = json.loads(contents.decode("utf-8"))
     internship = internship_request.internship.dict()
-    result = select_candidates(internship, resumes)
-    return result
+    return FastJSONResponse(content=select_candidates(internship, resumes))
 
 @app.get("/list_applicants")
 async def list_applicants():
-    all_candidates = []
-    for filename in os.listdir(UPLOAD_DIR):
-        if filename.endswith(".json"):
-            file_path = os.path.join(UPLOAD_DIR, filename)
-            try:
-                with open(file_path, "r", encoding="utf-8") as f:
-                    data = json.load(f)
-                    candidates = data.get("candidates", [])
-                    all_candidates.extend(candidates)
-            except Exception as e:
-                print(f"[ERROR] Failed to read {filename}: {e}")
-    return {"total_candidates": len(all_candidates), "candidates": all_candidates}
+    # The pool already holds every stored upload, one entry per candidate id (latest wins)
+    with POOL_LOCK:
+        all_candidates = list(APPLICANTS.values())
+    return FastJSONResponse(content={"total_candidates": len(all_candidates), "candidates": all_candidates})
 
 @app.get("/ping")
 async def ping():
@@ -596,15 +1251,7 @@ async def ping():
 async def recommend(file: UploadFile = File(...)):
     try:
         pdf_bytes = await file.read()
-        result = subprocess.run(
-            ["python", RESUME_PIPELINE],
-            input=pdf_bytes,
-            capture_output=True,
-            text=False
-        )
-        stdout_text = result.stdout.decode("utf-8", errors="ignore")
-        matches = re.findall(r"\[\{.*\}\]", stdout_text, re.DOTALL)
-        recommendations = json.loads(matches[-1]) if matches else {"output": stdout_text, "errors": result.stderr.decode("utf-8")}
+        recommendations = run_resume_pipeline(pdf_bytes)
         return JSONResponse(content={"recommendations": recommendations})
     except subprocess.CalledProcessError as e:
         return JSONResponse(content={"error": "Resume pipeline failed", "details": e.stderr.decode('utf-8')}, status_code=500)
@@ -0,0 +1,193 @@
+# quotas.py
+import math
+import numpy as np
+from candidate_table import field, location_id, social_code
+
+# Candidate columns that quotas can target directly on the CandidateTable
+BOOL_COLUMNS = ("rural", "past_participation")
+
+
+# ==============================
+# Parsing
+# ==============================
+class QuotaError(ValueError):
+    pass
+
+
+def seats_for(value, capacity):
+    """Numbers of 1 or more are seat counts (1 and 1.0 are one seat); numbers strictly
+    between 0 and 1 are a fraction of capacity"""
+    if isinstance(value, bool):
+        return int(value)
+    if not isinstance(value, (int, float)) or not math.isfinite(value):
+        raise QuotaError(f"quota must be a seat count or a fraction below 1, not {value!r}")
+    if 0.0 < value < 1.0:
+        return int(value * capacity + 0.5)
+    return max(0, int(value))
+
+
+def parse_quotas(quotas, capacity):
+    """
+    Normalize every supported quota spelling to a list of (column, value, seats):
+      {"rural_min": 2, "SC_min": 1}                -> legacy absolute minimums
+      {"rural": 0.3}                               -> fraction of capacity (below 1)
+      {"social": {"SC": 0.2, "ST": 3}}             -> per category, fraction or absolute
+      {"location": {"Chennai": 2}}                 -> any other candidate field
+    Raises QuotaError for anything else.
+    """
+    if quotas is not None and not isinstance(quotas, dict):
+        raise QuotaError("quotas must be an object")
+    rules = []
+    for key, value in (quotas or {}).items():
+        if isinstance(value, dict):
+            for category, amount in value.items():
+                rules.append((key, category, seats_for(amount, capacity)))
+        elif key.endswith("_min"):
+            name = key[:-len("_min")]
+            if name in BOOL_COLUMNS:
+                rules.append((name, True, seats_for(value, capacity)))
+            else:
+                rules.append(("social", name, seats_for(value, capacity)))
+        else:
+            rules.append((key, True, seats_for(value, capacity)))
+    return [rule for rule in rules if rule[2] > 0]
+
+
+def quota_constraints(table, rows, internship):
+    """List of (mask over rows, seats needed, label) for the internship's quotas"""
+    constraints = []
+    for column, value, seats in parse_quotas(internship.get('quotas'), internship['capacity']):
+        if column in BOOL_COLUMNS:
+            mask = getattr(table, column)[rows] == bool(value)
+        elif column == "social":
+            mask = table.social[rows] == social_code(value)
+        elif column == "location":
+            # Location ids, so "Bangalore" and "Bengaluru" fill the same quota
+            mask = table.location[rows] == location_id(value)
+        else:
+            mask = np.fromiter(
+                (field(table.records[i], column) == value for i in rows), dtype=bool, count=len(rows)
+            )
+        constraints.append((mask, seats, f"{column}={value}"))
+    return constraints
+
+
+# ==============================
+# Solver
+# ==============================
+def top_k(indices, scores, k):
+    """The k best of indices by score, best first (ties keep index order). O(n + k log k)"""
+    if k <= 0 or indices.size == 0:
+        return indices[:0]
+    if indices.size > k:
+        values = scores[indices]
+        kth = np.partition(values, indices.size - k)[indices.size - k]
+        indices = indices[values >= kth]
+    order = np.argsort(-scores[indices], kind="stable")
+    return indices[order][:k]
+
+
+def select_with_quotas(scores, constraints, capacity, population=None):
+    """
+    Pick `capacity` rows maximizing score subject to minimum seats per constraint.
+    Scarcest constraints are filled first; rows already picked count towards every
+    constraint they satisfy, so overlapping groups (rural AND SC) are not double
+    booked. Leftover capacity goes to the best remaining rows. Returns row indices
+    ordered best first. population: group sizes in the full pool when scores only
+    cover a shortlist of it, so scarcity is still judged on the full pool.
+    """
+    n = scores.size
+    capacity = min(int(capacity), n)
+    taken = np.zeros(n, dtype=bool)
+    picked = 0
+
+    if population is None:
+        population = [mask.sum() for mask, _, _ in constraints]
+    by_scarcity = [
+        constraints[c] for c in sorted(range(len(constraints)), key=lambda c: population[c] - constraints[c][1])
+    ]
+    for mask, seats, _ in by_scarcity:
+        need = min(seats - int((taken & mask).sum()), capacity - picked)
+        if need <= 0:
+            continue
+        chosen = top_k(np.flatnonzero(mask & ~taken), scores, need)
+        taken[chosen] = True
+        picked += chosen.size
+
+    if picked < capacity:
+        taken[top_k(np.flatnonzero(~taken), scores, capacity - picked)] = True
+
+    selected = np.flatnonzero(taken)
+    return selected[np.argsort(-scores[selected], kind="stable")]
+
+
+def quota_report(constraints, selected):
+    """Seats required vs filled per constraint, for the response"""
+    return [
+        {"quota": label, "required": int(seats), "filled": int(mask[selected].sum())}
+        for mask, seats, label in constraints
+    ]
+
+
+class QuotaShortlist:
+    """
+    The rows select_with_quotas could still pick from a pool seen in parts (chunks of
+    a file, shards): the best `capacity` overall plus the best `seats` of every quota
+    group. Selecting on the shortlist gives the same result as on the whole pool,
+    since population keeps the full group sizes (scarcity order) and rows are merged
+    in pool order (tie order).
+    """
+
+    def __init__(self, internship):
+        rules = parse_quotas(internship.get('quotas'), internship['capacity'])
+        self.capacity = internship['capacity']
+        self.seats = [seats for _, _, seats in rules]
+        self.labels = [f"{column}={value}" for column, value, _ in rules]  # as quota_constraints
+        self.population = np.zeros(len(rules), dtype=np.int64)
+        self.items = []  # one payload per shortlisted row (record, snapshot row, ...)
+        self.components = None
+        self.masks = np.zeros((len(rules), 0), dtype=bool)
+
+    def __len__(self):
+        return len(self.items)
+
+    def threshold(self, group, k):
+        """Score of the k-th best shortlisted row (of a quota group); -inf until k are held"""
+        if k <= 0:
+            return np.inf
+        if self.components is None:
+            return -np.inf
+        scores = self.components["final_score"]
+        if group is not None:
+            scores = scores[self.masks[group]]
+        if scores.size < k:
+            return -np.inf
+        return np.partition(scores, scores.size - k)[scores.size - k]
+
+    def merge(self, items, components, masks):
+        """Add rows that come after everything merged so far; masks is groups x rows"""
+        items = list(items)
+        if self.components is not None:
+            items = self.items + items
+            components = {
+                name: np.concatenate([self.components[name], values]) for name, values in components.items()
+            }
+            masks = np.concatenate([self.masks, masks], axis=1)
+        scores = components["final_score"]
+        keep = np.zeros(scores.size, dtype=bool)
+        keep[top_k(np.arange(scores.size), scores, self.capacity)] = True
+        for c, seats in enumerate(self.seats):
+            keep[top_k(np.flatnonzero(masks[c]), scores, seats)] = True
+        keep = np.flatnonzero(keep)  # ascending, so pool order is kept
+        self.items = [items[i] for i in keep]
+        self.components = {name: values[keep] for name, values in components.items()}
+        self.masks = masks[:, keep]
+
+    def constraints(self):
+        return [(self.masks[c], seats, self.labels[c]) for c, seats in enumerate(self.seats)]
+
+    def select(self):
+        """(order over the shortlist, constraints) as select_with_quotas on the full pool"""
+        constraints = self.constraints()
+        order = select_with_quotas(self.components["final_score"], constraints, self.capacity, self.population)
+        return order, constraints
@@ -233,8 +233,10 @@ def extract_contents_from_pdf_bytes(pdf_bytes, output_dir):
 
     with ThreadPoolExecutor() as thread_executor, ProcessPoolExecutor() as process_executor:
         page_futures = [thread_executor.submit(process_page, page_num) for page_num in range(total_pages)]
-        for future in page_futures:
+        for page_num, future in enumerate(page_futures):
             full_report += future.result() + "\n" + "="*40 + "\n"
+            # Picked up by the FastAPI job worker to report OCR progress
+            print(f"[PROGRESS] page {page_num + 1}/{total_pages}", file=sys.stderr, flush=True)
 
     doc.close()
     return full_report
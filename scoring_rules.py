@@ -0,0 +1,161 @@
+# scoring_rules.py
+import json
+import operator
+from functools import lru_cache
+import numpy as np
+import candidate_table  # module import: candidate_table imports this module too
+from skill_vocab import VOCAB, match_counts, normalize_skill
+
+# ==============================
+# Rule format
+# ==============================
+# internship["rules"] is a list of rules, each an "if" condition plus one action:
+#   {"if": {"field": "location", "eq": "Chennai"}, "bonus": 0.05}
+#   {"if": {"field": "skills", "has_any": ["aws", "gcp"]}, "penalty": 0.02}
+#   {"if": {"field": "past_participation", "eq": true}, "exclude": true}
+#   {"if": {"field": "social", "in": ["SC", "ST"]}, "require": true}
+# Conditions compare one candidate column, or combine others:
+#   {"all": [cond, ...]}, {"any": [cond, ...]}, {"not": cond}
+# An optional "name" documents a rule. Rules compile once per distinct rule list into
+# array expressions over CandidateTable columns; nothing runs per candidate.
+
+BOOL_FIELDS = ("rural", "past_participation", "has_experience", "fresher", "research")
+NUMBER_FIELDS = ("experience", "experience_months")
+CATEGORY_FIELDS = {"social": "social_code", "location": "location_id"}  # column -> code lookup
+SKILL_OPS = ("has", "has_any", "has_all")
+COMPARISONS = {
+    "eq": operator.eq, "ne": operator.ne,
+    "lt": operator.lt, "lte": operator.le, "gt": operator.gt, "gte": operator.ge,
+}
+ACTIONS = ("bonus", "penalty", "exclude", "require")
+
+
+class RuleError(ValueError):
+    pass
+
+
+def compile_condition(cond):
+    """Condition -> fn(table, rows) returning a boolean mask over rows"""
+    if not isinstance(cond, dict):
+        raise RuleError(f"Condition must be an object, got {cond!r}")
+    for combinator, reduce in (("all", np.logical_and.reduce), ("any", np.logical_or.reduce)):
+        if combinator in cond:
+            parts = [compile_condition(c) for c in cond[combinator]]
+            if not parts:
+                raise RuleError(f"'{combinator}' needs at least one condition")
+            return lambda table, rows: reduce([part(table, rows) for part in parts])
+    if "not" in cond:
+        part = compile_condition(cond["not"])
+        return lambda table, rows: ~part(table, rows)
+
+    name = cond.get("field")
+    ops = [key for key in cond if key != "field"]
+    if len(ops) != 1:
+        raise RuleError(f"Condition on {name!r} needs exactly one operator, got {ops}")
+    op, value = ops[0], cond[ops[0]]
+
+    if name == "skills":
+        if op not in SKILL_OPS:
+            raise RuleError(f"skills supports {list(SKILL_OPS)}, not {op!r}")
+        skills = [value] if isinstance(value, str) else list(value)
+        need = 1 if op == "has_any" else len({normalize_skill(s) for s in skills})
+        # Bitset built per call: a skill unknown when the rule was compiled may be interned since
+        return lambda table, rows: match_counts(table.skill_bits[rows], VOCAB.bitset(skills)) >= need
+
+    if name in CATEGORY_FIELDS:
+        code = getattr(candidate_table, CATEGORY_FIELDS[name])
+        if op in ("in", "not_in"):
+            if not isinstance(value, list):
+                raise RuleError(f"{op} on {name} needs a list")
+            negate = op == "not_in"
+            # Codes looked up per call: a location unknown when the rule was compiled may be interned since
+            return lambda table, rows: np.isin(getattr(table, name)[rows], [code(v) for v in value]) != negate
+        if op not in ("eq", "ne"):
+            raise RuleError(f"{name} supports eq, ne, in, not_in, not {op!r}")
+        compare = COMPARISONS[op]
+        return lambda table, rows: compare(getattr(table, name)[rows], code(value))
+
+    if name in BOOL_FIELDS or name in NUMBER_FIELDS:
+        allowed = ("eq", "ne") if name in BOOL_FIELDS else tuple(COMPARISONS)
+        if op not in allowed:
+            raise RuleError(f"{name} supports {list(allowed)}, not {op!r}")
+        compare = COMPARISONS[op]
+        target = bool(value) if name in BOOL_FIELDS else float(value)
+        return lambda table, rows: compare(getattr(table, name)[rows], target)
+
+    raise RuleError(
+        f"Unknown field {name!r}; rules can use skills, "
+        f"{', '.join([*CATEGORY_FIELDS, *BOOL_FIELDS, *NUMBER_FIELDS])}"
+    )
+
+
+class ScoringPlan:
+    """An internship's rules compiled to column expressions"""
+
+    def __init__(self, rules):
+        self.adjustments = []  # (condition, amount added to the score)
+        self.filters = []      # (condition, whether matching rows are kept or dropped)
+        for i, rule in enumerate(rules):
+            if not isinstance(rule, dict) or "if" not in rule:
+                raise RuleError(f"Rule {i} needs an 'if' condition")
+            actions = [key for key in rule if key in ACTIONS]
+            unknown = set(rule) - set(ACTIONS) - {"if", "name"}
+            if len(actions) != 1 or unknown:
+                raise RuleError(f"Rule {i} needs exactly one of {list(ACTIONS)}")
+            condition, action = compile_condition(rule["if"]), actions[0]
+            if action in ("bonus", "penalty"):
+                amount = float(rule[action])
+                self.adjustments.append((condition, amount if action == "bonus" else -amount))
+            elif rule[action]:
+                self.filters.append((condition, action == "require"))
+
+    def adjustment(self, table, rows):
+        """Summed bonuses/penalties per row (float32), or None without such rules"""
+        if not self.adjustments:
+            return None
+        total = np.zeros(len(rows), dtype=np.float32)
+        for condition, amount in self.adjustments:
+            total[condition(table, rows)] += amount
+        return total
+
+    def mask(self, table, rows):
+        """Mask over rows of those passing every exclude/require rule, or None without such rules"""
+        if not self.filters:
+            return None
+        keep = np.ones(len(rows), dtype=bool)
+        for condition, required in self.filters:
+            matched = condition(table, rows)
+            keep &= matched if required else ~matched
+        return keep
+
+
+@lru_cache(maxsize=256)
+def _compiled(rules_json):
+    return ScoringPlan(json.loads(rules_json))
+
+
+def plan_for(internship):
+    """Compiled rules of an internship (cached per distinct rule list), or None"""
+    rules = internship.get('rules')
+    if not rules:
+        return None
+    if not isinstance(rules, list):
+        raise RuleError("rules must be a list")
+    return _compiled(json.dumps(rules, sort_keys=True))
+
+
+def rule_mask(table, rows, internship):
+    """Mask over rows of those the internship's rules keep (None = all of them)"""
+    plan = plan_for(internship)
+    return None if plan is None else plan.mask(table, rows)
+
+
+def rule_filter(table, rows, internship):
+    """rows minus those the internship's rules exclude"""
+    keep = rule_mask(table, rows, internship)
+    return rows if keep is None else rows[keep]
+
+
+def rule_bonus(table, rows, internship):
+    plan = plan_for(internship)
+    return None if plan is None else plan.adjustment(table, rows)
@@ -0,0 +1,173 @@
+# shards.py
+import os
+import pickle
+import subprocess
+import sys
+import threading
+import traceback
+import numpy as np
+from candidate_table import base_components, with_semantic
+from quotas import QuotaShortlist, quota_constraints
+from scoring_rules import rule_filter
+from skill_vocab import VOCAB, match_counts
+from snapshot import Snapshot
+from stream_match import can_place, group_masks
+
+SHARD_WORKERS = os.cpu_count() or 1
+# Each worker is one shard; BLAS threads per worker would only oversubscribe the cores
+WORKER_ENV = {"OMP_NUM_THREADS": "1", "OPENBLAS_NUM_THREADS": "1", "MKL_NUM_THREADS": "1"}
+
+
+# ==============================
+# Worker side
+# ==============================
+class Shard:
+    """One worker's slice of a snapshot: rows [start, stop), memory-mapped"""
+
+    def __init__(self, path, index, count):
+        self.index = index
+        self.count = count
+        self.load(path)
+
+    def load(self, path):
+        snapshot = Snapshot(path)
+        # The worker's vocabulary is exactly the snapshot's: start fresh on every (re)load
+        VOCAB.clear()
+        if not snapshot.restore_vocab(VOCAB):
+            raise ValueError("skill vocabulary differs from the snapshot's")
+        n = len(snapshot)
+        self.start, self.stop = n * self.index // self.count, n * (self.index + 1) // self.count
+        self.table = snapshot.table(np.arange(self.start, self.stop))
+        self.embeddings = snapshot.embeddings[self.start:self.stop]
+        return self.stop - self.start
+
+    def ping(self):
+        return self.stop - self.start
+
+    def match(self, internship, intern_embedding, scoring, min_skills=0):
+        """(QuotaShortlist over snapshot rows, counts) for this shard"""
+        weights, rural_bonus, social_bonus, past_penalty = scoring
+        table = self.table
+        shortlist = QuotaShortlist(internship)
+        rows = np.flatnonzero(table.fresher)
+        counts = {"freshers": int(rows.size)}
+        if min_skills > 0:
+            required = VOCAB.bitset(internship['required_skills'])
+            rows = rows[match_counts(table.skill_bits[rows], required) >= min_skills]
+        rows = rule_filter(table, rows, internship)
+        counts["eligible"] = int(rows.size)
+        if rows.size == 0:
+            return shortlist, counts
+
+        components, partial = base_components(
+            table, rows, internship, weights, rural_bonus, social_bonus, past_penalty
+        )
+        masks = group_masks(quota_constraints(table, rows, internship), rows.size)
+        shortlist.population += masks.sum(axis=1)
+        # Only gather the embeddings of rows that can still be selected
+        keep = np.flatnonzero(can_place(shortlist, masks, partial, weights['semantic']))
+        rows = rows[keep]
+        sem_sim = self.embeddings[rows] @ intern_embedding
+        components = with_semantic(
+            {name: values[keep] for name, values in components.items()}, partial[keep], sem_sim, weights
+        )
+        shortlist.merge((rows + self.start).tolist(), components, masks[:, keep])
+        return shortlist, counts
+
+
+def serve(path, index, count):
+    """Worker loop: pickled (op, args) requests on stdin, (ok, value) replies on stdout"""
+    requests, replies = sys.stdin.buffer, sys.stdout.buffer
+    sys.stdout = sys.stderr  # stray prints must not corrupt the reply stream
+    shard = Shard(path, index, count)
+    while True:
+        try:
+            op, args = pickle.load(requests)
+        except EOFError:
+            return
+        try:
+            reply = (True, getattr(shard, op)(*args))
+        except Exception as e:
+            traceback.print_exc()
+            reply = (False, f"{type(e).__name__}: {e}")
+        pickle.dump(reply, replies, protocol=pickle.HIGHEST_PROTOCOL)
+        replies.flush()
+
+
+# ==============================
+# Parent side
+# ==============================
+class ShardPool:
+    """
+    Scatter-gather matching over a pool snapshot split across worker processes. Each
+    worker memory-maps its own row range (columns and embeddings), so shards share
+    the page cache instead of copying the pool. A match broadcasts the internship
+    embedding, every shard returns its local QuotaShortlist, and merging those in row
+    order gives the same selection as ranking the whole pool in one process.
+    """
+
+    def __init__(self, path, workers=SHARD_WORKERS):
+        self.lock = threading.Lock()
+        self.snapshot = Snapshot(path)
+        env = {**os.environ, **WORKER_ENV}
+        here = os.path.dirname(os.path.abspath(__file__))
+        self.procs = [
+            subprocess.Popen(
+                [sys.executable, os.path.join(here, "shards.py"), path, str(i), str(workers)],
+                stdin=subprocess.PIPE, stdout=subprocess.PIPE, cwd=here, env=env
+            )
+            for i in range(workers)
+        ]
+        self._scatter("ping")  # returns once every shard has loaded
+
+    def __len__(self):
+        return len(self.procs)
+
+    @property
+    def sources(self):
+        return self.snapshot.sources
+
+    def _scatter(self, op, *args):
+        with self.lock:
+            try:
+                for proc in self.procs:
+                    pickle.dump((op, args), proc.stdin, protocol=pickle.HIGHEST_PROTOCOL)
+                    proc.stdin.flush()
+                replies = [pickle.load(proc.stdout) for proc in self.procs]
+            except (EOFError, BrokenPipeError) as e:
+                raise RuntimeError(f"Shard worker exited: {e!r}")
+        errors = [value for ok, value in replies if not ok]
+        if errors:
+            raise RuntimeError(f"Shard failed: {errors[0]}")
+        return [value for _, value in replies]
+
+    def reload(self, path):
+        """Point every shard (and the parent's view) at a new snapshot"""
+        self.snapshot = Snapshot(path)
+        self._scatter("load", path)
+
+    def match(self, internship, intern_embedding, scoring, min_skills=0):
+        """((table, rows, components, order, constraints) or None, counts)"""
+        merged = QuotaShortlist(internship)
+        counts = {"shards": len(self.procs), "freshers": 0, "eligible": 0}
+        for shortlist, shard_counts in self._scatter("match", internship, intern_embedding, scoring, min_skills):
+            merged.population += shortlist.population
+            if len(shortlist):
+                merged.merge(shortlist.items, shortlist.components, shortlist.masks)
+            for key, value in shard_counts.items():
+                counts[key] += value
+        if not len(merged):
+            return None, counts
+        order, constraints = merged.select()
+        table = self.snapshot.table(np.array(merged.items, dtype=np.int64))
+        return (table, np.arange(len(merged)), merged.components, order, constraints), counts
+
+    def close(self):
+        for proc in self.procs:
+            proc.stdin.close()
+        for proc in self.procs:
+            proc.wait()
+
+
+if __name__ == "__main__":
+    serve(sys.argv[1], int(sys.argv[2]), int(sys.argv[3]))
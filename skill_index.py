@@ -0,0 +1,85 @@
+# skill_index.py
+from collections import Counter
+import numpy as np
+from skill_vocab import VOCAB
+
+
+class SkillIndex:
+    """Inverted index: normalized skill id -> ids of candidates that list it"""
+
+    def __init__(self, vocab=VOCAB):
+        self.vocab = vocab
+        self.postings = {}
+        self.skills_of = {}   # only for candidates added one by one
+        self.members = set()
+        self.segments = []    # (ids, skill bitsets, skill ids already expanded) from add_bitsets
+        self.dropped = set()  # bulk-indexed candidates removed since
+
+    def __len__(self):
+        return len(self.members)
+
+    def add(self, candidate_id, skills):
+        """Index (or re-index) one candidate"""
+        self.remove(candidate_id)
+        skill_ids = {self.vocab.intern(s) for s in skills}
+        for skill_id in skill_ids:
+            self.postings.setdefault(skill_id, set()).add(candidate_id)
+        self.skills_of[candidate_id] = skill_ids
+        self.members.add(candidate_id)
+
+    def add_bitsets(self, ids, skill_bits):
+        """Index many new candidates at once from packed skill bitsets (snapshot reload).
+        Nothing is scanned here: a skill's posting list is filled from the bitsets the
+        first time a query needs it, so reload cost does not grow with the vocabulary"""
+        ids = np.asarray(ids)
+        self.segments.append((ids, skill_bits, set()))
+        self.members.update(ids.tolist())
+
+    def _posting(self, skill_id):
+        """Posting list of one skill, expanding the bulk-indexed segments on first use"""
+        for ids, skill_bits, expanded in self.segments:
+            if skill_id in expanded:
+                continue
+            expanded.add(skill_id)
+            if skill_id >= skill_bits.shape[1] * 64:
+                continue
+            column = skill_bits[:, skill_id >> 6]
+            hits = set(ids[(column & (np.uint64(1) << np.uint64(skill_id & 63))) != 0].tolist()) - self.dropped
+            if hits:
+                self.postings.setdefault(skill_id, set()).update(hits)
+        return self.postings.get(skill_id, set())
+
+    def remove(self, candidate_id):
+        if candidate_id not in self.members:
+            return
+        self.members.discard(candidate_id)
+        skill_ids = self.skills_of.pop(candidate_id, None)
+        if skill_ids is None:
+            # Bulk-indexed: no per-candidate skill set kept, find it in the postings built
+            # so far; dropped keeps it out of the ones expanded later
+            self.dropped.add(candidate_id)
+            skill_ids = [s for s, posting in self.postings.items() if candidate_id in posting]
+        for skill_id in skill_ids:
+            posting = self.postings[skill_id]
+            posting.discard(candidate_id)
+            if not posting:
+                del self.postings[skill_id]
+
+    def candidates_with(self, required_skills, k=1):
+        """Ids of candidates that have at least k of the required skills"""
+        required = {self.vocab.lookup(s) for s in required_skills} - {None}
+        if k <= 0:
+            return set(self.members)
+        if len(required) < k:
+            return set()
+        postings = sorted((self._posting(skill_id) for skill_id in required), key=len)
+        if k == len(required):
+            # Must have all of them: intersect, smallest posting list first
+            result = set(postings[0])
+            for posting in postings[1:]:
+                result &= posting
+            return result
+        counts = Counter()
+        for posting in postings:
+            counts.update(posting)
+        return {candidate_id for candidate_id, n in counts.items() if n >= k}
@@ -0,0 +1,138 @@
+# skill_vocab.py
+import re
+import threading
+import numpy as np
+
+# ==============================
+# Normalization
+# ==============================
+# Spelling variants seen in resumes -> canonical skill name (after lowercasing)
+SKILL_ALIASES = {
+    "js": "javascript",
+    "ts": "typescript",
+    "py": "python",
+    "python3": "python",
+    "node": "node.js",
+    "nodejs": "node.js",
+    "reactjs": "react",
+    "react.js": "react",
+    "expressjs": "express",
+    "express.js": "express",
+    "mongo": "mongodb",
+    "postgres": "postgresql",
+    "ml": "machine learning",
+    "dl": "deep learning",
+    "natural language processing": "nlp",
+    "sklearn": "scikit-learn",
+    "scikit learn": "scikit-learn",
+    "huggingface": "hugging face",
+    "hf": "hugging face",
+    "tf": "tensorflow",
+    "k8s": "kubernetes",
+    "gcp": "google cloud",
+    "power bi": "powerbi",
+    "cpp": "c++",
+    "oop": "oops",
+}
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalize_skill(skill):
+    skill = _WHITESPACE.sub(" ", skill.strip().lower()).rstrip(".,;")
+    return SKILL_ALIASES.get(skill, skill)
+
+
+def skills_match_fraction(candidate_skills, required_skills):
+    """Scalar form of candidate_table.skill_fraction: fraction of the (normalized,
+    de-duplicated) required skills the candidate lists, 0 when none are required"""
+    required = {normalize_skill(s) for s in required_skills}
+    if not required:
+        return 0.0
+    return len(required & {normalize_skill(s) for s in candidate_skills or []}) / len(required)
+
+
+# ==============================
+# Vocabulary
+# ==============================
+class SkillVocabulary:
+    """Interns normalized skill names to dense integer ids (bit positions). Candidate
+    skills are interned; query skills (required_skills) are only looked up, so
+    requests do not grow the vocabulary."""
+
+    def __init__(self):
+        self.ids = {}
+        self.names = []
+        self.lock = threading.Lock()  # request threads and the job queue intern concurrently
+
+    def __len__(self):
+        return len(self.names)
+
+    def clear(self):
+        """Forget every skill (bit positions are only meaningful until the next intern)"""
+        with self.lock:
+            self.ids = {}
+            self.names = []
+
+    def intern(self, skill):
+        key = normalize_skill(skill)
+        skill_id = self.ids.get(key)
+        if skill_id is None:
+            with self.lock:
+                skill_id = self.ids.get(key)
+                if skill_id is None:
+                    self.names.append(key)
+                    skill_id = self.ids[key] = len(self.names) - 1
+        return skill_id
+
+    def lookup(self, skill):
+        """Id of an already known skill, or None (does not grow the vocabulary)"""
+        return self.ids.get(normalize_skill(skill))
+
+    def words(self):
+        """uint64 words needed for a bitset over the current vocabulary"""
+        return max(1, (len(self.names) + 63) // 64)
+
+    def bitset(self, skills, words=None):
+        """Packed uint64 bitset for one skill list of known skills (for query skills:
+        unknown ones are left out, no candidate can have them)"""
+        bits = np.zeros(words or self.words(), dtype=np.uint64)
+        for skill_id in {self.lookup(s) for s in skills} - {None}:
+            if skill_id < bits.size * 64:
+                bits[skill_id >> 6] |= np.uint64(1) << np.uint64(skill_id & 63)
+        return bits
+
+    def bitsets(self, skill_lists):
+        """(N, words) uint64 matrix, one packed bitset row per skill list"""
+        id_lists = [{self.intern(s) for s in skills} for skills in skill_lists]
+        matrix = np.zeros((len(id_lists), self.words()), dtype=np.uint64)
+        rows = np.fromiter((i for i, ids in enumerate(id_lists) for _ in ids), dtype=np.intp)
+        ids = np.fromiter((skill_id for ids in id_lists for skill_id in ids), dtype=np.uint64)
+        if ids.size:
+            np.bitwise_or.at(matrix, (rows, (ids >> np.uint64(6)).astype(np.intp)), np.uint64(1) << (ids & np.uint64(63)))
+        return matrix
+
+
+VOCAB = SkillVocabulary()
+
+
+# ==============================
+# Bitset helpers
+# ==============================
+if hasattr(np, "bitwise_count"):
+    def popcount(words):
+        """Number of set bits per row of a uint64 matrix"""
+        return np.bitwise_count(words).sum(axis=-1, dtype=np.int64)
+else:
+    _BYTE_COUNTS = np.array([bin(i).count("1") for i in range(256)], dtype=np.uint8)
+
+    def popcount(words):
+        """Number of set bits per row of a uint64 matrix"""
+        as_bytes = np.ascontiguousarray(words).view(np.uint8).reshape(*words.shape[:-1], -1)
+        return _BYTE_COUNTS[as_bytes].sum(axis=-1, dtype=np.int64)
+
+
+def match_counts(bits, required):
+    """How many of the required skills each bitset row has: popcount(bits & required)"""
+    width = min(bits.shape[-1], required.size)
+    return popcount(bits[..., :width] & required[:width])
@@ -0,0 +1,153 @@
+# snapshot.py
+import json
+import os
+import shutil
+from collections.abc import Mapping, Sequence
+import numpy as np
+import orjson
+from candidate_table import CandidateTable, LOCATION_IDS, SOCIAL_CATEGORIES, intern_location, social_code
+
+SNAPSHOT_VERSION = 2
+MANIFEST = "manifest.json"
+
+# One .npy file per column, all aligned on the candidate row (rows sorted by id)
+TABLE_COLUMNS = (
+    "ids", "skill_bits", "location", "social", "rural", "past_participation",
+    "has_experience", "fresher", "experience_months", "research", "experience"
+)
+COLUMNS = TABLE_COLUMNS + ("embeddings", "text_keys", "record_offsets", "record_blob")
+
+
+# ==============================
+# Writer
+# ==============================
+def save_snapshot(path, table, embeddings, text_keys, vocab, sources):
+    """
+    Persist a candidate pool as memory-mappable .npy columns plus a manifest.
+    table: CandidateTable over normalized record dicts; embeddings: (N, D) aligned
+    with the table rows; text_keys: per-row hash of the rendered profile text;
+    sources: whatever identifies the uploads covered (checked by the loader).
+    Written to a temp dir and swapped in, so readers never see a partial snapshot.
+    """
+    order = np.argsort(table.ids, kind="stable")
+    blobs = [orjson.dumps(table.records[i]) for i in order]
+    offsets = np.zeros(len(blobs) + 1, dtype=np.int64)
+    np.cumsum([len(b) for b in blobs], out=offsets[1:])
+    columns = {name: np.asarray(getattr(table, name))[order] for name in TABLE_COLUMNS}
+    columns.update({
+        "embeddings": np.asarray(embeddings, dtype=np.float32)[order],
+        "text_keys": np.frombuffer(b"".join(text_keys), dtype=np.uint8).reshape(len(text_keys), -1)[order],
+        "record_offsets": offsets,
+        "record_blob": np.frombuffer(b"".join(blobs), dtype=np.uint8),
+    })
+
+    tmp = path + ".tmp"
+    shutil.rmtree(tmp, ignore_errors=True)
+    os.makedirs(tmp)
+    for name, values in columns.items():
+        np.save(os.path.join(tmp, name + ".npy"), values)
+    manifest = {
+        "version": SNAPSHOT_VERSION,
+        "count": int(order.size),
+        "vocab": list(vocab.names),
+        # Codes in the location/social columns index into these lists
+        "locations": sorted(LOCATION_IDS, key=LOCATION_IDS.get),
+        "social_categories": list(SOCIAL_CATEGORIES),
+        "sources": sources,
+    }
+    with open(os.path.join(tmp, MANIFEST), "w", encoding="utf-8") as f:
+        json.dump(manifest, f)
+
+    old = path + ".old"
+    if os.path.exists(path):
+        os.replace(path, old)
+    os.replace(tmp, path)
+    shutil.rmtree(old, ignore_errors=True)
+
+
+# ==============================
+# Reader
+# ==============================
+class Snapshot:
+    """Memory-mapped view of a saved pool; opening it reads only the manifest"""
+
+    def __init__(self, path):
+        with open(os.path.join(path, MANIFEST), encoding="utf-8") as f:
+            self.manifest = json.load(f)
+        if self.manifest.get("version") != SNAPSHOT_VERSION:
+            raise ValueError(f"Unsupported snapshot version {self.manifest.get('version')}")
+        self.path = path
+        self.columns = {
+            name: np.load(os.path.join(path, name + ".npy"), mmap_mode="r") for name in COLUMNS
+        }
+        self.ids = self.columns["ids"]
+        self.embeddings = self.columns["embeddings"]
+        self.records = SnapshotRecords(self)
+
+    def __len__(self):
+        return self.ids.size
+
+    @property
+    def sources(self):
+        return self.manifest["sources"]
+
+    def record(self, row):
+        offsets = self.columns["record_offsets"]
+        return orjson.loads(self.columns["record_blob"][offsets[row]:offsets[row + 1]].tobytes())
+
+    def rows_of(self, ids):
+        """Snapshot rows of candidate ids (-1 where absent)"""
+        ids = np.asarray(ids, dtype=np.int64)
+        rows = np.searchsorted(self.ids, ids)
+        rows[rows >= self.ids.size] = 0
+        found = self.ids[rows] == ids if self.ids.size else np.zeros(ids.size, dtype=bool)
+        return np.where(found, rows, -1)
+
+    def restore_vocab(self, vocab):
+        """Intern the saved skill names; True if bit positions match the saved bitsets"""
+        return [vocab.intern(name) for name in self.manifest["vocab"]] == list(range(len(self.manifest["vocab"])))
+
+    def table(self, rows):
+        """CandidateTable over snapshot rows straight from the columns (records decode lazily)"""
+        location_map = np.array([intern_location(n) for n in self.manifest["locations"]] or [0], dtype=np.int32)
+        social_map = np.array([social_code(n) for n in self.manifest["social_categories"]], dtype=np.int16)
+        columns = {name: np.asarray(self.columns[name][rows]) for name in TABLE_COLUMNS}
+        columns["location"] = location_map[columns["location"]]
+        columns["social"] = social_map[columns["social"]]
+        return CandidateTable.from_columns(RowRecords(self, rows), columns)
+
+
+class SnapshotRecords(Mapping):
+    """Candidate id -> record dict, decoded from the snapshot blob on access"""
+
+    def __init__(self, snapshot):
+        self.snapshot = snapshot
+
+    def __getitem__(self, candidate_id):
+        row = self.snapshot.rows_of([candidate_id])[0]
+        if row < 0:
+            raise KeyError(candidate_id)
+        return self.snapshot.record(row)
+
+    def __contains__(self, candidate_id):
+        return bool(self.snapshot.rows_of([candidate_id])[0] >= 0)
+
+    def __iter__(self):
+        return iter(self.snapshot.ids.tolist())
+
+    def __len__(self):
+        return len(self.snapshot)
+
+
+class RowRecords(Sequence):
+    """Records of the given snapshot rows, by position, decoded on access"""
+
+    def __init__(self, snapshot, rows):
+        self.snapshot = snapshot
+        self.rows = rows
+
+    def __getitem__(self, i):
+        return self.snapshot.record(int(self.rows[i]))
+
+    def __len__(self):
+        return len(self.rows)
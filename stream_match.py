@@ -0,0 +1,223 @@
+# stream_match.py
+import codecs
+import json
+import numpy as np
+from candidate_table import CandidateTable, base_components, with_semantic, prune_by_bound
+from quotas import QuotaShortlist, quota_constraints
+from scoring_rules import rule_filter
+from skill_vocab import VOCAB, match_counts
+
+# ==============================
+# Config
+# ==============================
+STREAM_MEMORY_MB = 256   # default ceiling for one streaming match
+READ_SIZE = 1 << 20      # bytes read from the file per block
+RECORD_OVERHEAD = 8      # parsed dict + rendered profile text, per raw JSON character (rough)
+MAX_CHUNK = 8192         # candidates per chunk whatever the ceiling allows
+
+
+# ==============================
+# Incremental JSON reader
+# ==============================
+class JsonScanner:
+    """
+    Reads one JSON document from a binary file object a block at a time. Only the
+    top-level structure is walked by hand; each value below it (a candidate, the
+    internship) is decoded with json's raw_decode once its text is in the buffer,
+    so the buffer never holds much more than one block plus one value.
+    """
+
+    def __init__(self, fileobj, read_size=READ_SIZE):
+        self.fileobj = fileobj
+        self.read_size = read_size
+        self.text = codecs.getincrementaldecoder("utf-8-sig")()
+        self.decoder = json.JSONDecoder()
+        self.buf = ""
+        self.pos = 0
+        self.eof = False
+
+    def _fill(self):
+        """Append the next block to the buffer; False once the input is exhausted"""
+        if self.eof:
+            return False
+        data = self.fileobj.read(self.read_size)
+        self.eof = not data
+        self.buf = self.buf[self.pos:] + self.text.decode(data, final=self.eof)
+        self.pos = 0
+        return True
+
+    def peek(self):
+        """Next non-whitespace character ("" at the end of the input)"""
+        while True:
+            while self.pos < len(self.buf) and self.buf[self.pos] in " \t\r\n":
+                self.pos += 1
+            if self.pos < len(self.buf):
+                return self.buf[self.pos]
+            if not self._fill():
+                return ""
+
+    def expect(self, chars):
+        ch = self.peek()
+        if not ch or ch not in chars:
+            raise ValueError(f"Invalid JSON: expected one of {chars!r}, found {ch or 'end of input'!r}")
+        self.pos += 1
+        return ch
+
+    def value(self):
+        """Decode the next value; returns (value, its size in characters)"""
+        self.peek()
+        while True:
+            try:
+                value, end = self.decoder.raw_decode(self.buf, self.pos)
+            except json.JSONDecodeError:
+                if self._fill():
+                    continue
+                raise
+            # A number ending exactly at the buffer end may continue in the next block
+            if end < len(self.buf) or self.eof:
+                size, self.pos = end - self.pos, end
+                return value, size
+            self._fill()
+
+
+def scan_match_file(scanner):
+    """
+    (kind, value, size) events for a match file: ("internship", dict, n) and one
+    ("candidate", dict, n) per element of "candidates". Accepts the
+    {"internship": ..., "candidates": [...]} layout of /match_from_file or a bare
+    array of candidates; other top-level keys are skipped.
+    """
+    def elements():
+        scanner.expect("[")
+        if scanner.peek() == "]":
+            scanner.pos += 1
+            return
+        while True:
+            value, size = scanner.value()
+            yield "candidate", value, size
+            if scanner.expect(",]") == "]":
+                return
+
+    if scanner.peek() == "[":
+        yield from elements()
+        return
+    scanner.expect("{")
+    if scanner.peek() == "}":
+        return
+    while True:
+        key, _ = scanner.value()
+        scanner.expect(":")
+        if key == "candidates":
+            yield from elements()
+        else:
+            value, size = scanner.value()
+            if key == "internship":
+                yield "internship", value, size
+        if scanner.expect(",}") == "}":
+            return
+
+
+# ==============================
+# Streaming matcher
+# ==============================
+class StreamingMatcher:
+    """
+    Out-of-core rank_candidates. Candidates arrive in chunks; each chunk is scored
+    (semantic similarity only for rows whose best case still beats the shortlist) and
+    merged into a QuotaShortlist, so the selection equals ranking the whole pool at
+    once while memory holds one chunk plus the shortlist.
+    """
+
+    def __init__(self, internship, intern_embedding, embed, scoring, min_skills=0):
+        self.internship = internship
+        self.intern_embedding = intern_embedding
+        self.embed = embed  # records -> normalized embeddings (N, D)
+        self.weights, self.rural_bonus, self.social_bonus, self.past_penalty = scoring
+        self.min_skills = min_skills
+        self.shortlist = QuotaShortlist(internship)
+        self.stats = {"chunks": 0, "scanned": 0, "freshers": 0, "eligible": 0, "encoded": 0}
+
+    def run(self, items, memory_mb=STREAM_MEMORY_MB):
+        """Consume (candidate, size in JSON characters) pairs in chunks sized so a chunk
+        stays within half the ceiling (the rest is for the model and read buffer)"""
+        budget = memory_mb * (1 << 20) // 2
+        per_row = self.intern_embedding.size * self.intern_embedding.itemsize
+        chunk, used = [], 0
+        for record, size in items:
+            chunk.append(record)
+            used += size * RECORD_OVERHEAD + per_row
+            if used >= budget or len(chunk) >= MAX_CHUNK:
+                self.add(chunk)
+                chunk, used = [], 0
+        if chunk:
+            self.add(chunk)
+        return self
+
+    def add(self, records):
+        self.stats["chunks"] += 1
+        self.stats["scanned"] += len(records)
+        table = CandidateTable(records)
+        rows = np.flatnonzero(table.fresher)
+        self.stats["freshers"] += rows.size
+        if self.min_skills > 0:
+            required = VOCAB.bitset(self.internship['required_skills'])
+            rows = rows[match_counts(table.skill_bits[rows], required) >= self.min_skills]
+        rows = rule_filter(table, rows, self.internship)
+        if rows.size == 0:
+            return
+        self.stats["eligible"] += rows.size
+
+        shortlist = self.shortlist
+        components, partial = base_components(
+            table, rows, self.internship, self.weights, self.rural_bonus, self.social_bonus, self.past_penalty
+        )
+        masks = group_masks(quota_constraints(table, rows, self.internship), rows.size)
+        shortlist.population += masks.sum(axis=1)
+
+        # Encode only rows that can still make the top `capacity` (or the top `seats`
+        # of one of their quota groups), both within the chunk and against the shortlist
+        keep = np.flatnonzero(can_place(shortlist, masks, partial, self.weights['semantic']))
+        if keep.size == 0:
+            return
+        rows = rows[keep]
+        chunk_records = [records[i] for i in rows]
+        sem_sim = self.embed(chunk_records) @ self.intern_embedding
+        self.stats["encoded"] += rows.size
+        components = with_semantic(
+            {name: values[keep] for name, values in components.items()}, partial[keep], sem_sim, self.weights
+        )
+        shortlist.merge(chunk_records, components, masks[:, keep])
+
+    def result(self):
+        """(table, rows, components, order, constraints) over the shortlist, or None
+        when no candidate was eligible"""
+        shortlist = self.shortlist
+        if not len(shortlist):
+            return None
+        order, constraints = shortlist.select()
+        table = CandidateTable(shortlist.items)
+        return table, np.arange(len(shortlist)), shortlist.components, order, constraints
+
+
+def group_masks(constraints, n):
+    """quota_constraints output as one groups x rows boolean matrix"""
+    return np.array([mask for mask, _, _ in constraints], dtype=bool).reshape(len(constraints), n)
+
+
+def can_place(shortlist, masks, partial, semantic_weight):
+    """
+    Mask of rows that can still be selected whatever their semantic similarity: their
+    best case reaches the top `capacity` (or the top `seats` of one of their quota
+    groups) both among these rows (prune_by_bound) and against what the shortlist
+    already holds.
+    """
+    upper = np.maximum(0.0, partial + semantic_weight)
+
+    def bound(members, k, threshold):
+        return prune_by_bound(partial[members], semantic_weight, k) & (upper[members] >= threshold)
+
+    keep = bound(slice(None), shortlist.capacity, shortlist.threshold(None, shortlist.capacity))
+    for c, seats in enumerate(shortlist.seats):
+        members = np.flatnonzero(masks[c])
+        keep[members] |= bound(members, seats, shortlist.threshold(c, seats))
+    return keep
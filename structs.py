@@ -0,0 +1,69 @@
+# structs.py
+from typing import Any, Dict, List, Optional
+import msgspec
+
+# Request bodies decoded straight from JSON bytes into typed structs. Same fields and
+# defaults as the pydantic models in pybackend; the scoring code reads candidates
+# through candidate_table.field(), so the structs are consumed as-is (no .dict()).
+
+
+class Internship(msgspec.Struct):
+    id: int
+    title: str
+    description: str
+    required_skills: List[str]
+    location: str
+    capacity: int
+    quotas: Dict[str, Any] = {}
+    targeted_social: Optional[str] = None
+    rules: List[Dict[str, Any]] = []  # see scoring_rules
+
+
+class Candidate(msgspec.Struct, gc=False):
+    # gc=False: thousands of leaf objects per request that never form cycles
+    id: int
+    name: str
+    skills: List[str]
+    location: str
+    rural: bool = False
+    social: str = "General"
+    experience: List[str] = []
+    past_participation: bool = False
+    has_experience: bool = False
+
+
+class MatchRequest(msgspec.Struct):
+    internship: Internship
+    candidates: List[Candidate]
+
+
+class BatchRequest(msgspec.Struct):
+    internships: List[Internship]
+    candidates: List[Candidate]
+
+
+class WhatIfRequest(msgspec.Struct):
+    internship: Internship
+    candidates: Optional[List[Candidate]] = None  # None = the uploaded applicant pool
+    weights: List[Dict[str, Any]] = []            # partial weight sets, see whatif.resolve_weights
+    grid: Dict[str, List[Any]] = {}               # every combination of these values
+
+
+_DECODERS = {}
+
+
+def decode(body, struct_type):
+    """Validate and decode JSON bytes; lax like pydantic ("5" -> 5). Raises msgspec.MsgspecError"""
+    decoder = _DECODERS.get(struct_type)
+    if decoder is None:
+        decoder = _DECODERS[struct_type] = msgspec.json.Decoder(struct_type, strict=False)
+    return decoder.decode(body)
+
+
+def convert(obj, struct_type):
+    """Same as decode, for JSON that has already been parsed into Python objects"""
+    return msgspec.convert(obj, struct_type, strict=False)
+
+
+def as_dict(struct):
+    return msgspec.structs.asdict(struct)
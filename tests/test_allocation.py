@@ -0,0 +1,32 @@
+import numpy as np
+from allocation import allocate
+from quotas import select_with_quotas
+
+
+def random_case(rng):
+    n = int(rng.integers(1, 40))
+    scores = rng.integers(0, 50, size=n).astype(np.float64)
+    constraints = [
+        (rng.random(n) < rng.random(), int(rng.integers(1, 5)), f"g{c}")
+        for c in range(int(rng.integers(0, 4)))
+    ]
+    return scores, constraints, int(rng.integers(1, 10))
+
+
+def test_one_job_matches_select_with_quotas():
+    rng = np.random.default_rng(0)
+    for _ in range(2000):
+        scores, constraints, capacity = random_case(rng)
+        _, picks = allocate(scores[None, :], [{"capacity": capacity}], [constraints])
+        expected = select_with_quotas(scores, constraints, capacity)
+        assert sorted(picks[0]) == sorted(expected.tolist())
+
+
+def test_scarce_overlapping_quota_first():
+    # cap=2, g>=1 and h>=3: taking the best row (g only) first leaves two h seats
+    # unmet; filling the scarcer h first takes row 1, which is in both groups
+    scores = np.array([[50.0, 38.0, 12.0, 1.0]])
+    g = np.array([True, True, False, False])
+    h = np.array([False, True, True, True])
+    _, picks = allocate(scores, [{"capacity": 2}], [[(g, 1, "g"), (h, 3, "h")]])
+    assert sorted(picks[0]) == [1, 2]
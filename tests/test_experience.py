@@ -0,0 +1,24 @@
+import math
+from experience import experience_score, parse_experience
+
+
+def test_words_ending_in_mos_are_not_months():
+    months, research, fresher = parse_experience(["Built product demos"])
+    assert math.isnan(months) and not research and not fresher
+    assert math.isnan(parse_experience("Ran promos for a startup")[0])
+
+
+def test_fresher_flag_survives_demos():
+    months, _, fresher = parse_experience(["Fresher; built demos"])
+    assert math.isnan(months) and fresher
+    assert experience_score(["Fresher; built demos"]) == 1.0
+
+
+def test_durations():
+    assert parse_experience(["6 months", "1.5 yrs"])[0] == 24.0
+    assert parse_experience(["a few months"])[0] == 1.0
+    assert experience_score(["12 months"]) == 1.0
+    assert experience_score(["18 months"]) == 0.9
+    assert experience_score(["2 years"]) == 0.6
+    assert experience_score(["5 years of research"]) == 0.8
+    assert experience_score([]) == 1.0
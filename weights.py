@@ -0,0 +1,27 @@
+# weights.py
+# Scoring weights and bonuses, shared by every backend (pybackend, updated_bc, bc, match)
+
+WEIGHTS = {
+    "skill": 0.5,
+    "semantic": 0.3,
+    "location": 0.1,
+    "experience": 0.1
+}
+RURAL_BONUS = 0.1
+SOCIAL_BONUS = {"SC": 0.08, "ST": 0.1, "OBC": 0.05, "General": 0.0}
+PAST_PARTICIPATION_PENALTY = 0.15
+TARGETED_SOCIAL_BONUS = 0.06  # candidates of the internship's targeted_social category
+
+# Argument tuple taken by base_components / score_matrix / the matchers
+SCORE_ARGS = (WEIGHTS, RURAL_BONUS, SOCIAL_BONUS, PAST_PARTICIPATION_PENALTY)
+
+
+def weight_set():
+    """The current weights as one flat dict, the format of what-if weight sets"""
+    return {
+        **WEIGHTS,
+        "rural_bonus": RURAL_BONUS,
+        "social_bonus": dict(SOCIAL_BONUS),
+        "past_penalty": PAST_PARTICIPATION_PENALTY,
+        "targeted_social_bonus": TARGETED_SOCIAL_BONUS,
+    }
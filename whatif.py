@@ -0,0 +1,113 @@
+# whatif.py
+import itertools
+from collections import OrderedDict
+import numpy as np
+from candidate_table import SOCIAL_CATEGORIES, location_affinity, location_id, skill_fraction, social_code
+from scoring_rules import rule_bonus
+from weights import weight_set
+
+MAX_CACHED_COMPONENTS = 16
+MAX_WEIGHT_SETS = 1024
+
+# Weight-independent columns of the feature matrix, followed by one column per social
+# category; each weight set is one column of coefficients over the same layout
+FEATURES = (
+    "skill_frac", "semantic_sim", "location", "experience", "rural", "past_participation", "targeted_social",
+    "rule_bonus"  # the internship's own rules; not a weight, its coefficient is always 1
+)
+
+
+# ==============================
+# Weight sets
+# ==============================
+def resolve_weights(overrides):
+    """Full weight set from partial overrides (missing keys keep the current weights;
+    social_bonus overrides are merged per category)"""
+    resolved = weight_set()
+    unknown = set(overrides) - set(resolved)
+    if unknown:
+        raise ValueError(f"Unknown weights: {sorted(unknown)}")
+    for key, value in overrides.items():
+        if key == "social_bonus":
+            if not isinstance(value, dict):
+                raise ValueError("social_bonus must map social categories to bonuses")
+            resolved[key] = {**resolved[key], **{k: float(v) for k, v in value.items()}}
+        else:
+            resolved[key] = float(value)
+    return resolved
+
+
+def expand_grid(grid):
+    """{"skill": [0.4, 0.5], "semantic": [0.2, 0.3]} -> every combination as overrides"""
+    keys = list(grid)
+    return [dict(zip(keys, values)) for values in itertools.product(*(grid[k] for k in keys))]
+
+
+def weight_sets(weights=(), grid=None):
+    """Resolved weight sets for a request: the explicit ones, then the grid's"""
+    overrides = list(weights) + (expand_grid(grid) if grid else [])
+    if len(overrides) > MAX_WEIGHT_SETS:
+        raise ValueError(f"At most {MAX_WEIGHT_SETS} weight sets per request, got {len(overrides)}")
+    return [resolve_weights(o) for o in overrides]
+
+
+def coefficients(sets, categories):
+    """(K, W) matrix: column w holds weight set w over the feature layout"""
+    return np.array([
+        [
+            s["skill"], s["semantic"], s["location"], s["experience"],
+            s["rural_bonus"], -s["past_penalty"], s["targeted_social_bonus"], 1.0,
+            *(s["social_bonus"].get(name, 0.0) for name in categories)
+        ]
+        for s in sets
+    ], dtype=np.float32).reshape(len(sets), len(FEATURES) + len(categories)).T
+
+
+# ==============================
+# Components
+# ==============================
+class ScoreComponents:
+    """Weight-independent per-candidate features of one internship against one pool"""
+
+    __slots__ = ("table", "rows", "features", "categories", "constraints")
+
+    def __init__(self, table, rows, internship, sem_sim, constraints):
+        social = table.social[rows]
+        targeted = internship.get('targeted_social')
+        rules = rule_bonus(table, rows, internship)
+        self.table = table
+        self.rows = rows
+        self.categories = list(SOCIAL_CATEGORIES)
+        self.features = np.column_stack([
+            skill_fraction(table, rows, internship['required_skills']),
+            sem_sim,
+            location_affinity(table.location[rows], location_id(internship['location'])),
+            table.experience[rows],
+            table.rural[rows],
+            table.past_participation[rows],
+            (social == social_code(targeted)) if targeted else np.zeros(rows.size, dtype=bool),
+            rules if rules is not None else np.zeros(rows.size, dtype=np.float32),
+            social[:, None] == np.arange(len(self.categories))[None, :],
+        ]).astype(np.float32)
+        self.constraints = constraints
+
+    def rescore(self, sets):
+        """(N, W) final scores under every weight set, in one matrix product"""
+        return np.maximum(0.0, self.features @ coefficients(sets, self.categories))
+
+
+class ComponentCache:
+    """LRU of ScoreComponents by (internship, pool) key"""
+
+    def __init__(self, size=MAX_CACHED_COMPONENTS):
+        self.size = size
+        self.entries = OrderedDict()
+
+    def get(self, key, build):
+        entry = self.entries.get(key)
+        if entry is None:
+            entry = self.entries[key] = build()
+            while len(self.entries) > self.size:
+                self.entries.popitem(last=False)
+        self.entries.move_to_end(key)
+        return entry